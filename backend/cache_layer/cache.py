@@ -5,6 +5,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
+import math
 import time
 from collections import OrderedDict
 from dataclasses import dataclass
@@ -12,7 +13,15 @@ from typing import Dict, List, Optional
 
 from config import Config
 
-from .TopicState import TopicKey, TopicState
+try:
+    from .TopicState import TopicKey, TopicState
+except ImportError:
+    # Run as a plain script from cache_layer/ (e.g. test.py)
+    from TopicState import TopicKey, TopicState
+
+# Indexed by level - 1; L1 is the top level so it has no promotion threshold
+_CAPS = (Config.L1_CAPACITY, Config.L2_CAPACITY, Config.L3_CAPACITY)
+_PROMOTE_THRESHOLDS = (None, Config.L2_THRESHOLD, Config.L3_THRESHOLD)
 
 
 @dataclass
@@ -38,12 +47,9 @@ class TopicCacheManager(CacheLoader):
     def __init__(
         self,
     ):
-        self.cap_l1 = Config.L1_CAPACITY
-        self.cap_l2 = Config.L2_CAPACITY
-        self.cap_l3 = Config.L3_CAPACITY
+        self.cap_l1, self.cap_l2, self.cap_l3 = _CAPS
 
-        self.L3_THRESHOLD = Config.L3_THRESHOLD
-        self.L2_THRESHOLD = Config.L2_THRESHOLD
+        self.score_half_life = Config.SCORE_HALF_LIFE_SECONDS
 
         # Structures
         if not self._check_cache_table():
@@ -59,6 +65,9 @@ class TopicCacheManager(CacheLoader):
                 for key, value in od.items():
                     self.directory[key] = value
 
+        # Level-indexed view so per-access bookkeeping is a single lookup
+        self._levels = (self.L1, self.L2, self.L3)
+
     def lookup(self, key: TopicKey) -> Optional[TopicState]:
         """
         Lookup a topic in cache.
@@ -71,8 +80,9 @@ class TopicCacheManager(CacheLoader):
         # Update stats
         self._on_access(node)
 
-        # Apply promotion rules
-        self._maybe_promote(node)
+        # Apply promotion rules (L1 is the top level, nothing to promote to)
+        if node.level != 1:
+            self._maybe_promote(node)
 
         return node.state
 
@@ -99,8 +109,10 @@ class TopicCacheManager(CacheLoader):
         if key in self.directory:
             return self.directory[key].state
 
-        self._insert_into_L3(node)
+        # Register first, so an eviction triggered by this insert keeps the
+        # directory in step with the levels
         self.directory[key] = node
+        self._insert_into_L3(node)
 
         return state
 
@@ -112,28 +124,27 @@ class TopicCacheManager(CacheLoader):
 
         s = node.state
         s.access_count += 1
-        s.last_access_ts = now
 
-        s.score = s.access_count + 0.1
+        # Log-frequency plus exponential decay since the previous access
+        elapsed = now - s.last_access_ts
+        s.score = math.log1p(s.access_count) / 10.0 + 2.0 ** (
+            -elapsed / self.score_half_life
+        )
+        s.last_access_ts = now
 
         # Update recency ordering in its current level
-        if node.level == 1:
-            self.L1.move_to_end(node.key)
-        elif node.level == 2:
-            self.L2.move_to_end(node.key)
-        elif node.level == 3:
-            self.L3.move_to_end(node.key)
+        self._levels[node.level - 1].move_to_end(node.key)
 
     def _maybe_promote(self, node: CacheNode) -> None:
         """
         Promote node based on thresholds.
         """
-        s = node.state
+        if node.state.access_count < _PROMOTE_THRESHOLDS[node.level - 1]:
+            return
 
-        if node.level == 3 and s.access_count >= self.L3_THRESHOLD:
+        if node.level == 3:
             self._promote_L3_to_L2(node)
-
-        elif node.level == 2 and s.access_count >= self.L2_THRESHOLD:
+        else:
             self._promote_L2_to_L1(node)
 
     def _promote_L3_to_L2(self, node: CacheNode) -> None:
@@ -179,9 +190,15 @@ class TopicCacheManager(CacheLoader):
             self._evict_from_L3()
 
     def _evict_from_L3(self) -> None:
-        old_key, old_node = self.L3.popitem(last=False)
-
-        self.directory.pop(old_key, None)
+        # Evict a batch (one per 2048 entries, at least 8) so the next few
+        # inserts don't each cross the capacity boundary again. The slack only
+        # takes older entries, never the one that just arrived at the tail
+        n_over = len(self.L3) - self.cap_l3
+        n_evict = max(n_over, min(len(self.L3) - 1, max(8, len(self.L3) >> 11)))
+
+        for _ in range(n_evict):
+            old_key, old_node = self.L3.popitem(last=False)
+            self.directory.pop(old_key, None)
 
     def _assert_invariants(self):
         all_keys = set(self.L1) | set(self.L2) | set(self.L3)
@@ -7,13 +7,16 @@ class Config:
     DATASET_PATH = Path("data/datasets")
     INDEX_PATH = Path("data/index/faiss_hnsw.index")
 
-    NORMALIZATION_VERSION = "rag_v1"
-    CHUNK_VERSION = "chunk_v1"
+    NORMALIZATION_VERSION = "rag_v2"
+    CHUNK_VERSION = "chunk_v2"
     EMBEDDING_MODEL_ID = "embedding_v1"
 
     EMBEDDING_BATCH_SIZE = 64
+    EMBEDDING_DTYPE = "float16"
     ANN_TOP_K = 5
+    ANN_ENCODER = "sqfp16"
     METADATA_DB_PATH = Path("data/index/chunks.db")
+    TEXT_CACHE_PATH = Path("data/cache/text_extract")
 
     L1_CAPACITY = 32
     L2_CAPACITY = 128
@@ -21,6 +24,7 @@ class Config:
     RECENCY_BOOST = 0.2
     L2_THRESHOLD = 8
     L3_THRESHOLD = 3
+    SCORE_HALF_LIFE_SECONDS = 86400 * 30
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+import json
 import sqlite3
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional
@@ -8,12 +9,29 @@ class ChunkMetadataStore:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        self._conn = sqlite3.connect(self.db_path)
+        # Autocommit mode: write transactions are framed explicitly below
+        self._conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.row_factory = sqlite3.Row
         self._conn.execute("PRAGMA journal_mode=WAL;")
         self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.execute("PRAGMA temp_store=MEMORY;")
+        self._conn.execute("PRAGMA cache_size=-65536;")  # 64 MiB
+        self._conn.execute("PRAGMA mmap_size=1073741824;")  # 1 GiB
+        self._conn.execute("PRAGMA busy_timeout=5000;")
+        self._conn.execute("PRAGMA wal_autocheckpoint=10000;")
         self._create_tables()
 
+        # Set by insert_many; planner statistics are refreshed once, on close
+        self._stats_stale = False
+
     def close(self) -> None:
+        # One ANALYZE after all bulk loads instead of a full rescan per insert_many
+        if self._stats_stale:
+            self._conn.execute("ANALYZE chunks;")
         self._conn.close()
 
     def _create_tables(self) -> None:
@@ -41,6 +59,11 @@ class ChunkMetadataStore:
         self._conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_chunks_modality ON chunks(modality);"
         )
+        # Serves per-document lookups already ordered by chunk position
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chunks_doc_idx "
+            "ON chunks(document_id, chunk_index);"
+        )
 
         self._conn.commit()
 
@@ -77,24 +100,31 @@ class ChunkMetadataStore:
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
         """
 
-        values = []
-        for r in rows:
-            values.append(
-                (
-                    r["chunk_id"],
-                    r["document_id"],
-                    r["source_path"],
-                    r["modality"],
-                    int(r["chunk_index"]),
-                    int(r["start_offset"]),
-                    int(r["end_offset"]),
-                    r["chunk_version"],
-                    r["normalization_version"],
-                )
+        # Stream rows straight into executemany instead of materialising them
+        values = (
+            (
+                r["chunk_id"],
+                r["document_id"],
+                r["source_path"],
+                r["modality"],
+                int(r["chunk_index"]),
+                int(r["start_offset"]),
+                int(r["end_offset"]),
+                r["chunk_version"],
+                r["normalization_version"],
             )
+            for r in rows
+        )
 
-        with self._conn:
+        self._conn.execute("BEGIN IMMEDIATE;")
+        try:
             self._conn.executemany(sql, values)
+            self._conn.execute("COMMIT;")
+        except Exception:
+            self._conn.execute("ROLLBACK;")
+            raise
+
+        self._stats_stale = True
 
     def get_by_ids(self, chunk_ids: List[str]) -> List[Dict[str, Any]]:
         """
@@ -105,8 +135,11 @@ class ChunkMetadataStore:
         if not chunk_ids:
             return []
 
-        placeholders = ",".join("?" for _ in chunk_ids)
-        sql = f"""
+        # Bind all ids as one JSON array rather than one "?" per id, which keeps
+        # the statement constant and avoids SQLITE_MAX_VARIABLE_NUMBER. Being a
+        # single statement, concurrent lookups on the shared connection can't
+        # interleave the way a scratch table filled per call could
+        sql = """
         SELECT
             chunk_id,
             document_id,
@@ -118,29 +151,11 @@ class ChunkMetadataStore:
             chunk_version,
             normalization_version
         FROM chunks
-        WHERE chunk_id IN ({placeholders});
+        WHERE chunk_id IN (SELECT value FROM json_each(?));
         """
 
-        cur = self._conn.execute(sql, chunk_ids)
-        rows = cur.fetchall()
-
-        results = []
-        for row in rows:
-            results.append(
-                {
-                    "chunk_id": row[0],
-                    "document_id": row[1],
-                    "source_path": row[2],
-                    "modality": row[3],
-                    "chunk_index": row[4],
-                    "start_offset": row[5],
-                    "end_offset": row[6],
-                    "chunk_version": row[7],
-                    "normalization_version": row[8],
-                }
-            )
-
-        return results
+        cur = self._conn.execute(sql, (json.dumps(chunk_ids),))
+        return [dict(row) for row in cur]
 
     def count_chunks(self) -> int:
         cur = self._conn.execute("SELECT COUNT(*) FROM chunks;")
@@ -8,6 +8,7 @@ This is NOT a production service.
 This is a controlled ingestion + validation entry point.
 """
 
+import functools
 import hashlib
 import os
 import sys
@@ -18,13 +19,14 @@ sys.path.append(parent_dir)
 
 
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 import numpy as np
+import torch
 from chunkstore.Chunkstore import ChunkMetadataStore
 from ingest.chunker import Chunk, TextChunker
 from ingest.normalizer import NormalizationProfiles
-from ingest.storage.embedding import EmbeddingBatcher
+from ingest.storage.embedding import EmbeddingBatcher, EmbeddingRecord, quantize, stack_float32
 from ingest.storage.hnsw import HNSWIndex
 from ingest.Text_files_processing.file_loader import FileLoader
 from ingest.Text_files_processing.text_extractor import TextExtractor
@@ -35,11 +37,82 @@ from sentence_transformers import SentenceTransformer
 from config import Config
 
 
+@functools.lru_cache(maxsize=None)
+def _resolved_path_digest(path_str: str) -> str:
+    resolved = str(Path(path_str).resolve())
+    return hashlib.blake2b(
+        resolved.encode("utf-8"), digest_size=16, usedforsecurity=False
+    ).hexdigest()
+
+
 def stable_document_id(path: Path) -> str:
     """
     Deterministic document ID based on absolute file path.
     """
-    return hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()
+    return _resolved_path_digest(str(path))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_embedder() -> Tuple[SentenceTransformer, int]:
+    """
+    Load the embedding model once per process, with its embedding dimension.
+    """
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = SentenceTransformer("all-MiniLM-L6-v2", device=device)
+    return model, model.get_sentence_embedding_dimension()
+
+
+def _embedding_cache_paths() -> Tuple[Path, Path]:
+    index_dir = Path(Config.INDEX_PATH).parent
+    name = f"embeddings_{Config.EMBEDDING_MODEL_ID}"
+    return index_dir / f"{name}.npy", index_dir / f"{name}_ids.npy"
+
+
+def embedding_cache_key(chunk: Chunk) -> str:
+    # Chunk ids only cover offsets, so fold in the text in case the file was edited
+    text_digest = hashlib.blake2b(
+        chunk.text.encode("utf-8"), digest_size=8, usedforsecurity=False
+    ).hexdigest()
+    return f"{chunk.chunk_id}:{text_digest}"
+
+
+def load_cached_embeddings(keys: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Vectors from earlier runs for the given embedding_cache_keys.
+    Only the hit rows are read from the memory-mapped file.
+    """
+    vectors_path, ids_path = _embedding_cache_paths()
+    if not (vectors_path.exists() and ids_path.exists()):
+        return {}
+
+    vectors = np.load(vectors_path, mmap_mode="r")
+    ids = np.load(ids_path).tolist()
+    if len(ids) != len(vectors):
+        return {}
+
+    wanted = set(keys)
+    rows = [i for i, cid in enumerate(ids) if cid in wanted]
+
+    # Copy the hits out and drop the map: save_cached_embeddings replaces this
+    # file, which Windows refuses while any view of it is still alive
+    hits = np.array(vectors[rows])
+    del vectors
+
+    return {ids[i]: vector for i, vector in zip(rows, hits)}
+
+
+def save_cached_embeddings(keys: List[str], embeddings: List[EmbeddingRecord]) -> None:
+    vectors_path, ids_path = _embedding_cache_paths()
+    vectors_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write next to the target and swap in, so an interrupted save leaves the old cache
+    for path, array in (
+        (vectors_path, stack_float32([e.vector for e in embeddings])),
+        (ids_path, np.asarray(keys)),
+    ):
+        tmp_path = path.with_name(path.stem + ".tmp.npy")
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
 
 
 def log(msg: str) -> None:
@@ -56,35 +129,27 @@ def run_baseline_ingestion() -> List[Chunk]:
     if not files:
         raise RuntimeError("No files found in dataset path")
 
-    log("Extracting text")
-    extractor = TextExtractor()
-    extracted_texts: Dict[Path, str] = extractor.extract_all(files)
-
-    log("Normalizing text")
+    # 2-4. Extract, normalize and chunk one document at a time, so only the
+    # current document's full text is alive rather than the whole corpus twice
+    log("Extracting, normalizing and chunking documents")
+    extractor = TextExtractor(cache_dir=Config.TEXT_CACHE_PATH)
     normalizer = NormalizationProfiles.rag_ingestion()
-    normalized_texts: Dict[Path, str] = {
-        path: normalizer.normalize_text(text) for path, text in extracted_texts.items()
-    }
-
-    # 4. Chunk documents
-    log("Chunking documents")
     chunker = TextChunker(chunk_version=Config.CHUNK_VERSION)
 
     all_chunks: List[Chunk] = []
     chunk_to_source_path: Dict[str, Path] = {}
-    for path, text in normalized_texts.items():
+    for path, text in extractor.iter_extract(files):
         path = Path(path)
         doc_id = stable_document_id(path)
 
         chunks = chunker.chunk(
-            text=text,
+            text=normalizer.normalize_text(text),
             document_id=doc_id,
             normalization_version=Config.NORMALIZATION_VERSION,
         )
 
         for c in chunks:
-
-            all_chunks.extend(chunks)
+            all_chunks.append(c)
             chunk_to_source_path[c.chunk_id] = path
 
     if not all_chunks:
@@ -94,9 +159,7 @@ def run_baseline_ingestion() -> List[Chunk]:
 
     # 5. Load embedding model
     log("Loading embedding model")
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-
-    embedding_dim = model.get_sentence_embedding_dimension()
+    model, embedding_dim = _get_embedder()
 
     # 6. Embed chunks
     log("Embedding chunks")
@@ -104,18 +167,43 @@ def run_baseline_ingestion() -> List[Chunk]:
         model=model,
         embedding_model_id=Config.EMBEDDING_MODEL_ID,
         batch_size=Config.EMBEDDING_BATCH_SIZE,
+        dtype=Config.EMBEDDING_DTYPE,
     )
 
-    embeddings = batcher.embed_chunks(all_chunks)
+    cache_keys = [embedding_cache_key(c) for c in all_chunks]
+    cached_vectors = load_cached_embeddings(cache_keys)
+    to_embed = [c for c, key in zip(all_chunks, cache_keys) if key not in cached_vectors]
+    log(f"Reusing {len(all_chunks) - len(to_embed)} cached embeddings")
+
+    fresh = {e.chunk_id: e for e in batcher.embed_chunks(to_embed)}
+
+    embeddings: List[EmbeddingRecord] = []
+    for c, key in zip(all_chunks, cache_keys):
+        record = fresh.get(c.chunk_id)
+        if record is None:
+            vector = cached_vectors[key]
+            record = EmbeddingRecord(
+                embedding_id=c.chunk_id,
+                chunk_id=c.chunk_id,
+                document_id=c.document_id,
+                vector=quantize(vector, batcher.dtype),
+                embedding_model_id=Config.EMBEDDING_MODEL_ID,
+                embedding_dim=len(vector),
+            )
+        embeddings.append(record)
 
     if len(embeddings) != len(all_chunks):
         raise RuntimeError("Embedding count mismatch")
 
+    if to_embed:
+        save_cached_embeddings(cache_keys, embeddings)
+
     # 7. Build / load ANN index
     log("Building HNSW index")
     index = HNSWIndex(
         dim=embedding_dim,
         index_path=str(Config.INDEX_PATH),
+        encoder=Config.ANN_ENCODER,
     )
 
     index.add(embeddings)
@@ -127,25 +215,20 @@ def run_baseline_ingestion() -> List[Chunk]:
     log("Persisting chunk metadata")
     metadata_store = ChunkMetadataStore(Config.METADATA_DB_PATH)
 
-    rows = []
-    for c in all_chunks:
-        source_path = chunk_to_source_path[c.chunk_id]
-        # debugging :
-        # print(type(c.chunk_id))
-        # print(type(c.chunk_id[0]))
-        rows.append(
-            {
-                "chunk_id": c.chunk_id[0],
-                "document_id": c.document_id,
-                "source_path": str(source_path.resolve()),
-                "modality": "text",  # for now: only text
-                "chunk_index": c.chunk_index,
-                "start_offset": c.start_char,
-                "end_offset": c.end_char,
-                "chunk_version": c.chunk_version,
-                "normalization_version": Config.NORMALIZATION_VERSION,
-            }
-        )
+    rows = (
+        {
+            "chunk_id": c.chunk_id,
+            "document_id": c.document_id,
+            "source_path": str(chunk_to_source_path[c.chunk_id].resolve()),
+            "modality": "text",  # for now: only text
+            "chunk_index": c.chunk_index,
+            "start_offset": c.start_char,
+            "end_offset": c.end_char,
+            "chunk_version": c.chunk_version,
+            "normalization_version": Config.NORMALIZATION_VERSION,
+        }
+        for c in all_chunks
+    )
     metadata_store.insert_many(rows)
 
     log(f"Metadata store now contains {metadata_store.count_chunks()} rows")
@@ -160,32 +243,51 @@ def run_ann_sanity_tests_and_demo(chunks: List[Chunk]) -> None:
     log("Running ANN sanity tests and retrieval demo")
 
     # Reload index
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    embedding_dim = model.get_sentence_embedding_dimension()
+    model, embedding_dim = _get_embedder()
 
     index = HNSWIndex(
         dim=embedding_dim,
         index_path=str(Config.INDEX_PATH),
+        encoder=Config.ANN_ENCODER,
     )
     index.load()
 
     metadata_store = ChunkMetadataStore(Config.METADATA_DB_PATH)
 
     test_chunk = chunks[len(chunks) // 2]
-    query_text = test_chunk.text[:300]
-
-    query_vector = model.encode(
-        query_text,
-        normalize_embeddings=True,
+    same_doc_chunks = [
+        c
+        for c in chunks
+        if c.document_id == test_chunk.document_id and c.chunk_id != test_chunk.chunk_id
+    ]
+
+    # Encode every probe query in one batch and search them together
+    queries = [test_chunk.text[:300]]
+    if same_doc_chunks:
+        queries.append(same_doc_chunks[0].text[:300])
+
+    query_vectors = model.encode(
+        queries,
+        batch_size=32,
+        convert_to_numpy=True,
+        show_progress_bar=False,
     )
-
-    results = index.search(query_vector, k=Config.ANN_TOP_K)
+    query_results = index.search_batch(query_vectors, k=Config.ANN_TOP_K)
+    results = query_results[0]
 
     log("Self-retrieval test")
-    if test_chunk.chunk_id[0] not in results:
+    results_set = set(results)
+    if test_chunk.chunk_id not in results_set:
         raise AssertionError("Self-retrieval test FAILED")
     log("Self-retrieval test PASSED")
 
+    if same_doc_chunks:
+        log("Same-document neighbourhood check")
+        neighbour_results = query_results[1]
+        same_doc_ids = {c.chunk_id for c in same_doc_chunks}
+        hits = [cid for cid in neighbour_results if cid in same_doc_ids]
+        log(f"{len(hits)}/{len(neighbour_results)} neighbours come from the same document")
+
     # ---- Retrieval demo: ANN -> metadata -> file paths ----
     log("Retrieval demo: resolving chunk IDs to source files")
 
@@ -22,21 +22,24 @@ def ingest_image(file_directory: str):
     # Loading & preprocessing images
     preprocessed_images = image_processor.process_directory(file_directory)
 
-    for img, image_path in preprocessed_images:
+    # Caption all images in batches up front rather than one model call per image
+    captions = captioner.generate_captions_batch([img for img, _ in preprocessed_images])
 
-        # OCR processing
+    # OCR processing, batched tesseract runs spread over worker processes.
+    # Only the text is stored, so skip the per-word details
+    ocr_texts = ocr.extract_text_parallel([img for img, _ in preprocessed_images], text_only=True)
 
-        ocr_result = ocr.extract_text(img)
-        has_text = bool(ocr_result["text"])
+    # Visual embeddings for all images, batched on the GPU
+    image_embeddings = visual_embedder.generate_embeddings_batch([img for img, _ in preprocessed_images])
 
-        # simple image-type detector
-        image_type = "screenshot" if has_text else "photo"
+    for (img, image_path), caption, ocr_text, image_embedding in zip(
+        preprocessed_images, captions, ocr_texts, image_embeddings
+    ):
 
-        # Caption generator function for generating caption for the given image
-        caption = captioner.generate_caption(img)
+        has_text = bool(ocr_text)
 
-        # Visual embedding  function for the given image
-        image_embedding = visual_embedder.generate_embedding(img)
+        # simple image-type detector
+        image_type = "screenshot" if has_text else "photo"
 
         # Metadata extraction function for extraction of meta data from the image
         metadata = metadata_extractor.extract_metadata(
@@ -50,7 +53,7 @@ def ingest_image(file_directory: str):
         record = {
             "embedding": image_embedding,
             "metadata": metadata,
-            "ocr_text": ocr_result["text"]
+            "ocr_text": ocr_text
         }
 
         results.append(record)
@@ -2,10 +2,79 @@
 
 # Importing libraries
 
-from PIL import Image, ImageEnhance
+from PIL import Image
+from pathlib import Path
+import functools
+import struct
+import numpy as np
+import cv2
 import os
 
+
+# Same result as ImageEnhance.Sharpness(1.5): 1.5 * original - 0.5 * PIL's SMOOTH filter
+_SMOOTH_KERNEL = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13.0
+_SHARPEN_KERNEL = -0.5 * _SMOOTH_KERNEL
+_SHARPEN_KERNEL[1, 1] += 1.5
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers carrying the image dimensions (excludes DHT/JPG/DAC)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _read_header_size(image_path):
+    # Reads (width, height) straight from the PNG/JPEG header; None if it can't be parsed
+    with open(image_path, "rb") as f:
+        head = f.read(24)
+
+        if head.startswith(_PNG_SIGNATURE) and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+
+        if head[:2] != b"\xff\xd8":
+            return None
+
+        f.seek(2)
+        while True:
+            marker = f.read(2)
+            if len(marker) != 2 or marker[0] != 0xFF:
+                return None
+            if marker[1] == 0xFF:  # fill byte before the real marker
+                f.seek(-1, os.SEEK_CUR)
+                continue
+
+            length_bytes = f.read(2)
+            if len(length_bytes) != 2:
+                return None
+            (length,) = struct.unpack(">H", length_bytes)
+
+            if marker[1] in _JPEG_SOF_MARKERS:
+                frame = f.read(5)
+                if len(frame) != 5:
+                    return None
+                height, width = struct.unpack(">HH", frame[1:5])
+                return width, height
+
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+@functools.lru_cache(maxsize=4096)
+def _image_size(image_path, mtime_ns):
+    # mtime_ns is part of the cache key so edited files are re-read
+    try:
+        size = _read_header_size(image_path)
+    except OSError:
+        size = None
+
+    if size is None:
+        # Fall back to PIL for anything the header parser doesn't understand
+        with Image.open(image_path) as img:
+            size = img.size
+
+    return size
+
+
 class ImagePreprocessor:
+    sharpen_kernel = _SHARPEN_KERNEL
+
     def __init__(self):
         self.supported_formats = {'jpg', 'jpeg', 'png'}
         self.max_dimension = 1024
@@ -46,27 +115,30 @@ class ImagePreprocessor:
             print(img.size)
             # print(type(img))
             
-            brightness_enhancer = ImageEnhance.Brightness(img)
-            img = brightness_enhancer.enhance(3.0) # It enhance all the 3 colors Red, Green, Blue
+            # Single float buffer for both enhancements instead of one PIL image per step
+            arr = np.asarray(img, dtype=np.float32)
+
+            np.multiply(arr, 3.0, out=arr) # It enhance all the 3 colors Red, Green, Blue
+            np.clip(arr, 0, 255, out=arr)
 
 
             # Just increasing brightness and sharpness is enough and if you want you can do contrast and saturation
 
             # contrast_enhancer = ImageEnhance.Contrast(img)
-            # img = contrast_enhancer.enhance(1.5) 
+            # img = contrast_enhancer.enhance(1.5)
             # as we use contrast here it will make the brighter part of image even brighter and darker spot even darker
             # Increase contrast by 50%
             # So dont want to use brightness enhancer......
             # print("Contrast enhanced")
 
-            sharpness_enhancer = ImageEnhance.Sharpness(img)
-            img = sharpness_enhancer.enhance(1.5)
+            arr = cv2.filter2D(arr, -1, self.sharpen_kernel)
+            np.clip(arr, 0, 255, out=arr)
             # increase sharpness by 50%
 
             print("Sharapness enhanced")
 
-            image_copy = img.copy()
-            return image_copy
+            # fromarray owns its buffer, so no extra .copy() is needed
+            return Image.fromarray(arr.astype(np.uint8))
         
 
     def validate_image(self, image_path):
@@ -77,16 +149,15 @@ class ImagePreprocessor:
             # return False, "File does not exist"
 
         # extension = os.path.splitext(image_path)[1].lower()  # Check whether the given image is in supported format
-        extension = image_path.split(".")[-1]
+        extension = Path(image_path).suffix.lower().lstrip(".")
         print(f"extension = {extension}")
         if extension not in self.supported_formats:
             return False, f"Unsupported format: {extension}"
 
         try:
-            with Image.open(image_path) as img:
-                width, height = img.size
-                if width < self.min_dimension or height < self.min_dimension:
-                    return False, "Image too small to process"
+            width, height = _image_size(image_path, os.stat(image_path).st_mtime_ns)
+            if width < self.min_dimension or height < self.min_dimension:
+                return False, "Image too small to process"
         except Exception:
             return False, "Corrupted or unreadable image"
 
@@ -81,7 +81,7 @@ class MetadataExtractor:
 
     def _compute_edge_density(self, image: Image.Image):
         
-        gray = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2GRAY)
+        gray = cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2GRAY)
         edges = cv2.Canny(gray, 100, 200)
         return float(np.sum(edges > 0) / edges.size)
 
@@ -1,8 +1,13 @@
 import os
+from collections import deque
 from pathlib import Path
 from typing import Dict, List
 
 
+# Extension (without the dot, lowercase) -> category key in load_files() output
+_CATEGORY_BY_EXTENSION = {"doc": "docs", "docx": "docs", "txt": "txt", "pdf": "pdf"}
+
+
 class FileLoader:
     def __init__(self, folder_path: Path) -> None:
         self.folder_path = folder_path
@@ -14,38 +19,33 @@ class FileLoader:
 
     def _get_file_category(self, file_path: str) -> str:
         """Determine the category of a file based on its extension"""
-        extension = Path(file_path).suffix.lower()
-
-        if extension in {".doc", ".docx"}:
-            return "docs"
-        elif extension == ".txt":
-            return "txt"
-        elif extension == ".pdf":
-            return "pdf"
-        return None
+        extension = Path(file_path).suffix.lower().lstrip(".")
+        return _CATEGORY_BY_EXTENSION.get(extension)
 
     def _scan_directory(
         self, directory: Path, loaded_files: Dict[str, List[Path]]
     ) -> None:
-        """Recursively scan directory and categorize files"""
-        try:
-            for item in os.listdir(directory):
-                item_path = os.path.join(directory, item)
-
-                if self._is_directory(item_path):
-                    # Recursively scan subdirectories
-                    self._scan_directory(item_path, loaded_files)
-                else:
-                    # Check if file has allowed extension
-                    extension = Path(item_path).suffix.lower()
-                    if extension in self.allowed_extensions:
-                        category = self._get_file_category(item_path)
+        """Scan directory tree (iteratively) and categorize files"""
+        # scandir entries carry the dirent type, so no extra stat per file
+        stack = deque([directory])
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+
+                        # Same rule as Path.suffix: no dot, or a leading-dot-only name, has no extension
+                        stem, _, extension = entry.name.rpartition(".")
+                        category = _CATEGORY_BY_EXTENSION.get(extension.lower()) if stem else None
                         if category:
-                            loaded_files[category].append(item_path)
-        except PermissionError:
-            print(f"Permission denied: {directory}")
-        except Exception as e:
-            print(f"Error scanning {directory}: {e}")
+                            loaded_files[category].append(entry.path)
+            except PermissionError:
+                print(f"Permission denied: {current}")
+            except Exception as e:
+                print(f"Error scanning {current}: {e}")
 
     def load_files(self) -> Dict[str, List[Path]]:
         """
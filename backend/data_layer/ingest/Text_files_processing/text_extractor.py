@@ -1,29 +1,136 @@
+import hashlib
+import io
 import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator, Optional, Tuple
+
+# Bump when extraction logic changes so cached texts are not reused
+_EXTRACTOR_VERSION = "3"
+
+# Content streams above this size are pre-filtered before text extraction
+_PDF_FILTER_MIN_BYTES = 512 * 1024
+# Operators kept by the filter: text objects, text state and positioning, and the
+# graphics state that moves text (q/Q, cm, gs, Do for forms). Paths, fills, colour
+# and inline images are dropped along with their operands
+_PDF_TEXT_OPERATORS = frozenset(
+    {
+        b"BT", b"ET", b"Tj", b"'", b'"', b"TJ", b"Tf", b"Tm", b"Td", b"TD", b"T*",
+        b"Tc", b"Tw", b"Tz", b"TL", b"Ts", b"cm", b"q", b"Q", b"gs", b"Do",
+    }
+)
+# One content-stream token per match. Strings keep their escapes and balanced
+# parentheses (nested up to three deep), so an "ET" inside a literal is operand
+# data; inline images are skipped whole from BI to EI. Anything left unpaired
+# is caught by the last alternative and makes the filter give up on the page
+_PDF_TOKEN = re.compile(
+    rb"(?P<comment>%[^\r\n]*)"
+    rb"|(?P<inline>BI(?=\s).*?\sID\s.*?\sEI(?=\s|$))"
+    rb"|(?P<operand>"
+    rb"\((?:[^()\\]|\\.|\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\))*\)"
+    rb"|<<|>>|<[0-9A-Fa-f\s]*>|[\[\]{}]|/[^\s()<>\[\]{}/%]*"
+    rb")"
+    rb"|(?P<word>[^\s()<>\[\]{}/%]+)"
+    rb"|(?P<bad>[()<>])",
+    re.S,
+)
+
+
+def _filter_text_ops(raw: bytes) -> bytes:
+    """Keep each text-relevant operator with its operands, one statement per line"""
+    kept = []
+    operands_start = None
+    for match in _PDF_TOKEN.finditer(raw):
+        kind = match.lastgroup
+        if kind == "comment":
+            continue
+        if kind == "bad":
+            raise ValueError(f"unbalanced {match.group()!r} at byte {match.start()}")
+        if kind == "operand" or (kind == "word" and _is_pdf_operand(match.group())):
+            if operands_start is None:
+                operands_start = match.start()
+            continue
+
+        # An operator (or a whole inline image) ends the statement
+        if kind == "word" and match.group() in _PDF_TEXT_OPERATORS:
+            start = match.start() if operands_start is None else operands_start
+            kept.append(raw[start : match.end()])
+        operands_start = None
+
+    return b"\n".join(kept)
+
+
+def _is_pdf_operand(word: bytes) -> bool:
+    # Numbers and the keyword constants; every other regular-character run is an operator
+    return word[0] in b"+-.0123456789" or word in (b"true", b"false", b"null")
 
 
 class TextExtractor:
-    def __init__(self):
-        """Initialize the text extractor"""
-        pass
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """Initialize the text extractor, optionally caching results by file content"""
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-    def _extract_from_txt(self, file_path: str) -> str:
-        """Extract text from a .txt file"""
+    def _fingerprint(self, file_path: str) -> str:
+        """Hash of file bytes, extension and extractor version"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{_EXTRACTOR_VERSION}|{Path(file_path).suffix.lower()}|".encode("utf-8"))
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def _read_cache(self, fingerprint: str) -> Optional[str]:
+        cache_path = self.cache_dir / f"{fingerprint}.txt"
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
+            with open(cache_path, "r", encoding="utf-8") as file:
                 return file.read()
-        except UnicodeDecodeError:
+        except (OSError, UnicodeDecodeError):
+            # Missing, unreadable or corrupt entries are misses; a good write replaces them
+            return None
+
+    def _write_cache(self, fingerprint: str, text: str) -> None:
+        cache_path = self.cache_dir / f"{fingerprint}.txt"
+        # Unique tmp name per writer: .txt files are extracted on threads of
+        # one process, and identical files share a fingerprint
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.cache_dir, prefix=f"{fingerprint}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(text)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            # The cache only saves work; a failed write must not stop ingestion
+            print(f"Warning: could not cache extracted text for {fingerprint}: {e}")
             try:
-                with open(file_path, "r", encoding="latin-1") as file:
-                    return file.read()
-            except Exception as e:
-                print(f"Error reading {file_path}: {e}")
-                return ""
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _extract_from_txt(self, file_path: str) -> str:
+        """Extract text from a .txt file"""
+        try:
+            # Read the bytes once; a failed UTF-8 decode falls back without re-reading
+            data = Path(file_path).read_bytes()
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
             return ""
 
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            text = data.decode("latin-1")
+
+        # Same newline handling as text-mode open()
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
     def _extract_from_docx(self, file_path: str) -> str:
         """Extract text from a .docx file"""
         try:
@@ -59,43 +166,135 @@ class TextExtractor:
             return ""
 
     def _extract_from_pdf(self, file_path: str) -> str:
-        """Extract text from a .pdf file"""
+        """Extract text from a .pdf file, streaming page by page"""
         try:
-            import PyPDF2
-
-            text = []
-            with open(file_path, "rb") as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text.append(page.extract_text())
-            return "\n".join(text)
+            try:
+                import pypdf
+            except ImportError:
+                import PyPDF2 as pypdf
+
+            # Write each page into one buffer instead of keeping a list of page strings
+            buf = io.StringIO()
+            with open(file_path, "rb", buffering=1 << 23) as file:
+                pdf_reader = pypdf.PdfReader(file, strict=False)
+                for i, page in enumerate(pdf_reader.pages):
+                    original = self._strip_graphics_ops(page, pypdf)
+                    try:
+                        text = page.extract_text()
+                    except Exception:
+                        if original is None:
+                            raise
+                        # Filtered stream didn't parse; retry this page unfiltered
+                        page[pypdf.generic.NameObject("/Contents")] = original
+                        text = page.extract_text()
+                    if i:
+                        buf.write("\n")
+                    buf.write(text or "")
+            return buf.getvalue()
         except ImportError:
-            print("Error: PyPDF2 library not installed. Run: pip install PyPDF2")
+            print("Error: pypdf library not installed. Run: pip install pypdf")
             return ""
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
             return ""
 
+    @staticmethod
+    def _strip_graphics_ops(page, pypdf):
+        """
+        Swap a huge page content stream for its text-relevant operators only.
+        Returns the original /Contents entry when the page was changed, else None.
+        """
+        contents = page.get_contents()
+        if contents is None:
+            return None
+        raw = contents.get_data()
+        if len(raw) <= _PDF_FILTER_MIN_BYTES:
+            return None
+
+        try:
+            kept = _filter_text_ops(raw)
+        except Exception:
+            # Not tokenizable here; the page keeps its full stream
+            return None
+
+        original = page[pypdf.generic.NameObject("/Contents")]
+        filtered = pypdf.generic.ContentStream(None, page.pdf)
+        filtered.set_data(kept)
+        # Only the in-memory page is changed; extract_text uses a ContentStream as-is
+        page[pypdf.generic.NameObject("/Contents")] = filtered
+        return original
+
     def extract_text_from_file(self, file_path: str) -> str:
         """Extract text from a single file based on its extension"""
         if not os.path.exists(file_path):
             print(f"Error: File does not exist: {file_path}")
             return ""
 
+        fingerprint = None
+        if self.cache_dir is not None:
+            try:
+                fingerprint = self._fingerprint(file_path)
+            except OSError as e:
+                # Unreadable or vanished file: extract uncached, which reports it as before
+                print(f"Warning: could not fingerprint {file_path}: {e}")
+            else:
+                cached = self._read_cache(fingerprint)
+                if cached is not None:
+                    return cached
+
         extension = Path(file_path).suffix.lower()
 
         if extension == ".txt":
-            return self._extract_from_txt(file_path)
+            text = self._extract_from_txt(file_path)
         elif extension == ".docx":
-            return self._extract_from_docx(file_path)
+            text = self._extract_from_docx(file_path)
         elif extension == ".doc":
-            return self._extract_from_doc(file_path)
+            text = self._extract_from_doc(file_path)
         elif extension == ".pdf":
-            return self._extract_from_pdf(file_path)
+            text = self._extract_from_pdf(file_path)
         else:
             print(f"Unsupported file type: {extension}")
             return ""
 
+        # Empty output usually means a failed read or missing library, so don't pin it
+        if fingerprint is not None and text:
+            self._write_cache(fingerprint, text)
+
+        return text
+
+    def iter_extract(self, loaded_files: Dict[str, list]) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (source_file_path, extracted_text) as files finish, so callers can
+        process one document at a time instead of holding the whole corpus.
+        Parsed formats (PDF/DOC/DOCX) come first, then plain text.
+        """
+        # PDF/DOC(X) parsing is CPU-bound, so spread it over processes
+        parsed_paths = [
+            file_path
+            for category, file_paths in loaded_files.items()
+            if category != "txt"
+            for file_path in file_paths
+        ]
+        if parsed_paths:
+            workers = min(os.cpu_count() or 1, len(parsed_paths))
+            chunksize = max(1, len(parsed_paths) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(
+                    _extract_file, parsed_paths, repeat(self.cache_dir), chunksize=chunksize
+                )
+                for file_path, text in zip(parsed_paths, results):
+                    print(f"Processing: {file_path}")
+                    yield file_path, text
+
+        # Plain text is just file I/O, threads are enough
+        txt_paths = loaded_files.get("txt", [])
+        if txt_paths:
+            with ThreadPoolExecutor() as executor:
+                results = executor.map(self.extract_text_from_file, txt_paths)
+                for file_path, text in zip(txt_paths, results):
+                    print(f"Processing: {file_path}")
+                    yield file_path, text
+
     def extract_all(self, loaded_files: Dict[str, list]) -> Dict[str, str]:
         """
         Extract text from all files returned by FileLoader.
@@ -106,15 +305,19 @@ class TextExtractor:
         Returns:
             Dictionary with format {source_file_path: "extracted_text", ...}
         """
-        extracted_texts = {}
+        texts = dict(self.iter_extract(loaded_files))
+
+        # Keep the category/file order callers got from the serial version
+        return {
+            file_path: texts[file_path]
+            for file_paths in loaded_files.values()
+            for file_path in file_paths
+        }
 
-        for category, file_paths in loaded_files.items():
-            for file_path in file_paths:
-                print(f"Processing: {file_path}")
-                text = self.extract_text_from_file(file_path)
-                extracted_texts[file_path] = text
 
-        return extracted_texts
+def _extract_file(file_path: str, cache_dir: Optional[Path] = None) -> str:
+    # Module-level so it pickles for ProcessPoolExecutor
+    return TextExtractor(cache_dir).extract_text_from_file(file_path)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,35 @@
 import os
+import math
+import numpy as np
+import torch
 import whisper
 import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pydub import AudioSegment
+from pydub.utils import mediainfo
 from download_whisper import download
 from pathlib import Path
 from typing import List, Dict
 
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+try:
+    from scipy.signal import resample_poly
+except ImportError:
+    resample_poly = None
+
+# Every CPU worker holds its own fp32 copy of the model, so the default pool
+# stays small regardless of core count (pass max_workers to go wider)
+_DEFAULT_CPU_WORKERS = 2
+
 
 class WhisperAudioToText:
     
@@ -16,6 +40,10 @@ class WhisperAudioToText:
         
         self.model_name = model_name
         self.model_dir = model_dir
+
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        # Half precision only helps (and only works) on the GPU
+        self.use_fp16 = self.device == "cuda"
         
         os.makedirs(self.model_dir, exist_ok=True)
         model_path = os.path.join(self.model_dir, f"{self.model_name}.pt")
@@ -24,12 +52,18 @@ class WhisperAudioToText:
             download()  # As whisper is not available on my user we calls download_whisper.py to download it on them
                         # Later we can write it in bat file.
 
-        # Load model (offline)
+        # Loaded (offline) on first transcription, so a parent that hands files
+        # to the worker pool never holds a copy it doesn't use
+        self.model = None
 
-        self.model = whisper.load_model(
-            self.model_name,
-            download_root=self.model_dir
-        )
+    def _load_model(self):
+        if self.model is None:
+            self.model = whisper.load_model(
+                self.model_name,
+                device=self.device,
+                download_root=self.model_dir
+            )
+        return self.model
 
     # Processing audio files in the given directory from user given directory
 
@@ -59,64 +93,86 @@ class WhisperAudioToText:
         return sorted(audio_files)
 
     # Processing all audio files from the directory
-    def process_directory(self, directory: str, language='en', recursive: bool = True) -> List[Dict]:
+    def process_directory(self, directory: str, language='en', recursive: bool = True, max_workers=None) -> List[Dict]:
         
         # Find all audio files
         audio_files = self.find_audio_files(directory, recursive=recursive)
         
         if not audio_files:
             return []
-        
-        results = []
-        
-        # Process each audio file
-        for idx, audio_path in enumerate(audio_files, 1):
-            
-            try:
-                # Get metadata
-                metadata = self.get_audio_metadata(audio_path)
-                # print(f"Duration: {metadata['duration_seconds']:.1f}s")
-                # print(f" Size: {metadata['file_size_bytes'] / (1024*1024):.2f} MB")
-                
-                # Convert to text
-                transcription = self.convert_to_text(audio_path, language=language)
-                
-                # Combine results
-                result = {
-                    'file_path': audio_path,
-                    'text': transcription['text'],
-                    'metadata': metadata,
-                    'language': transcription['language'],
-                    'duration': transcription['duration']
-                }
-                
-                results.append(result)
-                
-            except Exception as e:
-                # Still add to results with error info
-                results.append({
-                    'file_path': audio_path,
-                    'text': '',
-                    'error': str(e),
-                    'metadata': None,
-                    'language': None,
-                    'duration': 0
-                })
-                return e
-        
-        
-        return results
+
+        workers = max_workers or min(_DEFAULT_CPU_WORKERS, os.cpu_count() or 1, len(audio_files))
+
+        # The GPU is shared by one model, so files go through it one after another,
+        # with the next file's metadata and decode prepared on a thread meanwhile
+        if self.device == "cuda" or workers <= 1:
+            # Load up front so a broken model fails the call, not every file
+            self._load_model()
+            results = []
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                pending = executor.submit(self._prepare_file, audio_files[0])
+                for audio_path, next_path in zip(audio_files, audio_files[1:] + [None]):
+                    prepared = pending
+                    if next_path is not None:
+                        pending = executor.submit(self._prepare_file, next_path)
+                    results.append(self.process_file(audio_path, language, prepared))
+            return results
+
+        # On CPU every worker process loads its own copy of the model once
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.model_name, self.model_dir, workers),
+        ) as executor:
+            return list(executor.map(_process_file, audio_files, [language] * len(audio_files)))
+
+    def _prepare_file(self, audio_path):
+        # CPU/disk side of a file: header metadata plus decoded audio
+        return self.get_audio_metadata(audio_path), self._load_audio(audio_path)
+
+    def process_file(self, audio_path, language='en', prepared=None) -> Dict:
+        try:
+            # Get metadata and audio, from the prefetch future if there is one
+            metadata, audio = prepared.result() if prepared is not None else self._prepare_file(audio_path)
+            # print(f"Duration: {metadata['duration_seconds']:.1f}s")
+            # print(f" Size: {metadata['file_size_bytes'] / (1024*1024):.2f} MB")
+
+            # Convert to text
+            transcription = self.convert_to_text(audio_path, language=language, audio=audio)
+
+            # Combine results
+            return {
+                'file_path': audio_path,
+                'text': transcription['text'],
+                'metadata': metadata,
+                'language': transcription['language'],
+                'duration': transcription['duration']
+            }
+
+        except Exception as e:
+            # Still add to results with error info
+            return {
+                'file_path': audio_path,
+                'text': '',
+                'error': str(e),
+                'metadata': None,
+                'language': None,
+                'duration': 0
+            }
 
     # Speech to text each file from the directory
-    def convert_to_text(self, audio_path, language='en'):
+    def convert_to_text(self, audio_path, language='en', audio=None):
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
-        result = self.model.transcribe(
-            audio_path,
+        if audio is None:
+            audio = self._load_audio(audio_path)
+
+        result = self._load_model().transcribe(
+            audio,
             language=language,
             verbose=False,
-            fp16=False
+            fp16=self.use_fp16
         )
 
         transcript = result['text'].strip()
@@ -130,24 +186,85 @@ class WhisperAudioToText:
             'duration': duration
         }
 
+    def _load_audio(self, audio_path):
+        # Decode wav/flac/ogg in-process instead of spawning ffmpeg for every file;
+        # Whisper expects 16 kHz mono float32
+        if soundfile is not None:
+            try:
+                data, sample_rate = soundfile.read(audio_path, dtype='float32', always_2d=True)
+            except Exception:
+                data = None  # not a libsndfile format, let ffmpeg handle it
+            if data is not None:
+                audio = data.mean(axis=1)
+                if sample_rate == whisper.audio.SAMPLE_RATE:
+                    return audio
+                if resample_poly is not None:
+                    g = math.gcd(whisper.audio.SAMPLE_RATE, sample_rate)
+                    return resample_poly(audio, whisper.audio.SAMPLE_RATE // g, sample_rate // g).astype(np.float32)
+
+        return whisper.load_audio(audio_path)
+
     # Metadata from the audio file
     def get_audio_metadata(self, audio_path):
-        audio = AudioSegment.from_file(audio_path)
+        duration, sample_rate, channels = self._read_audio_header(audio_path)
 
         return {
             'filename': os.path.basename(audio_path),
             'file_path': audio_path,
             'file_extension': os.path.splitext(audio_path)[1].lower(),
-            'file_size_bytes': os.path.getsize(audio_path)/ (1024 * 1024),
-            'duration_seconds': len(audio) / 1000.0,
-            'sample_rate': audio.frame_rate,
-            'channels': audio.channels,
+            'file_size_bytes': os.path.getsize(audio_path),
+            'duration_seconds': duration,
+            'sample_rate': sample_rate,
+            'channels': channels,
             'audio_hash': self._hash_file(audio_path)
         }
 
+    def _read_audio_header(self, audio_path):
+        # Duration, sample rate and channels from the file header, without decoding the audio
+        if soundfile is not None:
+            try:
+                info = soundfile.info(audio_path)
+                return info.duration, info.samplerate, info.channels
+            except Exception:
+                pass  # libsndfile can't read mp3/m4a/aac/wma
+
+        if mutagen is not None:
+            audio_file = mutagen.File(audio_path)
+            info = getattr(audio_file, 'info', None)
+            if info is not None and getattr(info, 'sample_rate', None) and getattr(info, 'channels', None):
+                return info.length, info.sample_rate, info.channels
+
+        # One ffprobe call
+        info = mediainfo(audio_path)
+        if info.get('duration') and info.get('sample_rate') and info.get('channels'):
+            return float(info['duration']), int(info['sample_rate']), int(info['channels'])
+
+        # Last resort: full decode
+        audio = AudioSegment.from_file(audio_path)
+        return len(audio) / 1000.0, audio.frame_rate, audio.channels
+
     def _hash_file(self, filepath):
-        hasher = hashlib.sha256()
-        with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hasher.update(chunk)
-        return hasher.hexdigest()
\ No newline at end of file
+        # 1 MB reads into one reused buffer; BLAKE2b is faster than SHA-256 here
+        hasher = hashlib.blake2b(digest_size=32)
+        buf = bytearray(1 << 20)
+        view = memoryview(buf)
+        with open(filepath, 'rb', buffering=0) as f:
+            while (n := f.readinto(buf)):
+                hasher.update(view[:n])
+        return hasher.hexdigest()
+
+
+# Per-process converter for the CPU worker pool
+_worker_converter = None
+
+
+def _init_worker(model_name, model_dir, workers):
+    global _worker_converter
+    # Split the cores between workers instead of every process grabbing all of them
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    _worker_converter = WhisperAudioToText(model_name=model_name, model_dir=model_dir)
+    _worker_converter._load_model()
+
+
+def _process_file(audio_path, language):
+    return _worker_converter.process_file(audio_path, language)
@@ -3,7 +3,10 @@ import re
 from dataclasses import dataclass
 from typing import List, Tuple
 
-CHUNK_VERSION = "chunk_v1"
+CHUNK_VERSION = "chunk_v2"
+
+_SENT_RE = re.compile(r"(?<=[.!?])\s+")
+_PARA_RE = re.compile(r"\n{2,}")
 
 
 @dataclass(frozen=True)
@@ -42,21 +45,16 @@ class TextChunker:
         paragraphs = split_paragraphs(text)
         chunks: List[Chunk] = []
 
-        current_paras = []
-        current_tokens = 0
-        chunk_index = 0
-        para_index = 0
+        # Decide placement on token counts alone, then build the Chunk objects
+        plan = self._plan([p[3] for p in paragraphs])
 
-        i = 0
-        while i < len(paragraphs):
-            para_text, start, end = paragraphs[i]
-            tokens = estimate_tokens(para_text)
-
-            # If a single paragraph is too large, force split
-            if tokens > self.max_tokens:
+        chunk_index = 0
+        for force_split, para_ids in plan:
+            if force_split:
                 # split paragraph by sentences
-                sentences = re.split(r"(?<=[.!?])\s+", para_text)
-                for sent in sentences:
+                para_index = para_ids[0]
+                para_text, start, _, _ = paragraphs[para_index]
+                for sent in _SENT_RE.split(para_text):
                     chunks.append(
                         self._emit_chunk(
                             [
@@ -72,79 +70,85 @@ class TextChunker:
                         )
                     )
                     chunk_index += 1
-                i += 1
-                para_index += 1
                 continue
 
-            # Check if adding this paragraph fits in target
-            if current_tokens + tokens <= self.target_tokens:
-                current_paras.append((para_text, start, end))
-                current_tokens += tokens
-                i += 1
-                para_index += 1
-            else:
-                # --- FIX START ---
-                # If current_paras is empty, it means this SINGLE paragraph is > target_tokens
-                # but < max_tokens. We MUST accept it to avoid an infinite loop or crash.
-                if not current_paras:
-                    current_paras.append((para_text, start, end))
-                    current_tokens += tokens
-                    i += 1
-                    para_index += 1
-                    continue
-                # --- FIX END ---
-
-                # Emit what we have so far
-                chunks.append(
-                    self._emit_chunk(
-                        current_paras,
-                        document_id,
-                        normalization_version,
-                        current_paras[0][1],
-                        current_paras[-1][2],
-                        para_index - len(current_paras),
-                        para_index - 1,
-                        chunk_index,
-                    )
-                )
-                chunk_index += 1
-
-                # Overlap handling
-                current_paras, current_tokens = self._apply_overlap(current_paras)
-
-                # We do NOT increment 'i' here because we still need to process
-                # the current paragraph (paragraphs[i]) in the next iteration
-                # (now that the buffer is cleared/overlapped).
-
-        # Flush any remaining paragraphs
-        if current_paras:
+            paras = [paragraphs[k] for k in para_ids]
             chunks.append(
                 self._emit_chunk(
-                    current_paras,
+                    paras,
                     document_id,
                     normalization_version,
-                    current_paras[0][1],
-                    current_paras[-1][2],
-                    para_index - len(current_paras),
-                    para_index - 1,
+                    paras[0][1],
+                    paras[-1][2],
+                    para_ids[0],
+                    para_ids[-1],
                     chunk_index,
                 )
             )
+            chunk_index += 1
 
         return chunks
 
-    def _apply_overlap(self, paras):
-        overlap = []
-        tokens = 0
+    def _plan(self, tokens: List[int]) -> List[Tuple[bool, Tuple[int, ...]]]:
+        """
+        Placement pass over per-paragraph token counts.
+        Returns (force_split, paragraph_indices) per chunk, in emission order.
+        """
+        target_tokens = self.target_tokens
+        max_tokens = self.max_tokens
+        overlap_tokens = self.overlap_tokens
+
+        plan = []
+        current = []  # paragraph indices in the open chunk
+        current_tokens = 0
+
+        i = 0
+        n = len(tokens)
+        while i < n:
+            para_tokens = tokens[i]
 
-        for para in reversed(paras):
-            para_tokens = estimate_tokens(para[0])
-            if tokens + para_tokens > self.overlap_tokens:
-                break
-            overlap.insert(0, para)
-            tokens += para_tokens
+            # If a single paragraph is too large, force split
+            if para_tokens > max_tokens:
+                plan.append((True, (i,)))
+                i += 1
+                continue
+
+            # Take the paragraph if it fits in target. An empty chunk always takes
+            # it (a paragraph between target and max) to avoid an infinite loop
+            if current_tokens + para_tokens <= target_tokens or not current:
+                current.append(i)
+                current_tokens += para_tokens
+                i += 1
+                continue
+
+            # Emit what we have so far
+            plan.append((False, tuple(current)))
+
+            # Overlap: walk back over the tail, then take it in one slice
+            kept = 0
+            cut = len(current)
+            for j in range(len(current) - 1, -1, -1):
+                t = tokens[current[j]]
+                if kept + t > overlap_tokens:
+                    break
+                kept += t
+                cut = j
+            current = current[cut:]
+            current_tokens = kept
+
+            # If the overlap leaves no room for this paragraph, drop it;
+            # otherwise the same chunk would be emitted forever
+            if current_tokens + para_tokens > target_tokens:
+                current = []
+                current_tokens = 0
+
+            # 'i' is not advanced: the current paragraph is retried next iteration
+
+        # Flush any remaining paragraphs
+        if current:
+            plan.append((False, tuple(current)))
 
-        return overlap, tokens
+        return plan
 
     def _emit_chunk(
         self,
@@ -183,24 +187,26 @@ class TextChunker:
         )
 
 
-def split_paragraphs(text: str) -> List[Tuple[str, int, int]]:
+def split_paragraphs(text: str) -> List[Tuple[str, int, int, int]]:
     """
     Splits text into paragraphs while preserving character offsets.
-    Returns: List of (paragraph_text, start_char, end_char)
+    Returns: List of (paragraph_text, start_char, end_char, token_estimate)
     """
     paragraphs = []
     cursor = 0
 
-    for match in re.finditer(r"(.*?)(\n\n+|$)", text, flags=re.S):
-        para = match.group(1).strip()
-        if not para:
-            cursor = match.end()
-            continue
+    # Slice between blank-line separators: one linear scan, no backtracking
+    for sep in _PARA_RE.finditer(text):
+        para = text[cursor:sep.start()].strip()
+        if para:
+            paragraphs.append((para, cursor, sep.start(), estimate_tokens(para)))
+        cursor = sep.end()
 
-        start = match.start(1)
-        end = match.end(1)
-        paragraphs.append((para, start, end))
-        cursor = match.end()
+    # A single trailing newline is not part of the last paragraph's span
+    end = len(text) - 1 if text.endswith("\n") and len(text) > cursor else len(text)
+    para = text[cursor:end].strip()
+    if para:
+        paragraphs.append((para, cursor, end, estimate_tokens(para)))
 
     return paragraphs
 
@@ -213,8 +219,7 @@ def generate_chunk_id(
     paragraph_end: int,
     normalization_version: str,
     chunk_version: str,
-    debug=True,
-) -> Tuple[str, str]:
+) -> str:
     canonical = (
         f"doc:{document_id}"
         f"|norm:{normalization_version}"
@@ -222,10 +227,12 @@ def generate_chunk_id(
         f"|char:{start_char}-{end_char}"
         f"|para:{paragraph_start}-{paragraph_end}"
     )
-    hash_id = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
-    return (hash_id, canonical) if debug else hash_id
+    # Identifier, not a security boundary: 128-bit BLAKE2b is plenty and faster than SHA-256
+    return hashlib.blake2b(
+        canonical.encode("ascii"), digest_size=16, usedforsecurity=False
+    ).hexdigest()
 
 
 def estimate_tokens(text: str) -> int:
-    # Rough but stable: ~0.75 tokens per word
-    return int(len(text.split()) * 0.75)
+    # Rough but stable: ~4 characters per BPE token, no allocation
+    return (len(text) + 3) >> 2
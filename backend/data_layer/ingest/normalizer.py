@@ -1,9 +1,33 @@
 """Normalize and preprocess extracted text"""
 
-import re
-from typing import Dict, Optional
+import functools
+from typing import Dict
 
-NORMALIZATION_VERSION = "rag_v1"
+try:
+    # RE2 matches in linear time, so hostile input can't make the scan backtrack
+    import re2 as regex
+
+    # RE2's \s, \w and \d are ASCII-only; spell out the Unicode classes Python's re uses
+    _WS_CHARS = r"\t-\r\x1c-\x1f\x85\pZ"
+    _WORD_CHARS = r"\pL\pN_"
+    _DIGIT = r"\p{Nd}"
+except ImportError:
+    import re as regex
+
+    _WS_CHARS = r"\s"
+    _WORD_CHARS = r"\w"
+    _DIGIT = r"\d"
+
+NORMALIZATION_VERSION = "rag_v2"
+
+_URL_PATTERN = rf"(?:https?://|www\.)[^{_WS_CHARS}]+"
+_EMAIL_PATTERN = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"
+_NUMBER_PATTERN = rf"{_DIGIT}+"
+_PUNCTUATION_PATTERN = rf"[^{_WORD_CHARS}{_WS_CHARS}]+"
+_SPECIAL_CHARS_PATTERN = rf"[^a-zA-Z0-9{_WS_CHARS}.,!?;:\-\']+"
+_WS_PATTERN = rf"[{_WS_CHARS}]+"
+
+_PLACEHOLDERS = {"url": "[URL]", "email": "[EMAIL]"}
 
 
 class TextNormalizer:
@@ -29,64 +53,81 @@ class TextNormalizer:
         self.remove_newlines = remove_newlines
         self.strip_whitespace = strip_whitespace
 
-    def _replace_urls(self, text: str, placeholder: str = "[URL]") -> str:
-        url_pattern = r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
-        text = re.sub(url_pattern, placeholder, text)
-        www_pattern = r"www\.(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
-        text = re.sub(www_pattern, placeholder, text)
-        return text
-
-    def _replace_emails(self, text: str, placeholder: str = "[EMAIL]") -> str:
-        email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-        return re.sub(email_pattern, placeholder, text)
-
-    def _remove_numbers(self, text: str) -> str:
-        return re.sub(r"\d+", "", text)
-
-    def _remove_punctuation(self, text: str) -> str:
-        return re.sub(r"[^\w\s]", "", text)
-
-    def _remove_special_chars(self, text: str) -> str:
-        return re.sub(r"[^a-zA-Z0-9\s.,!?;:\-\']", "", text)
-
-    def _remove_extra_whitespace(self, text: str) -> str:
-        return re.sub(r"\s+", " ", text)
-
-    def _normalize_newlines(self, text: str) -> str:
-        """Normalize newlines while preserving paragraph structure"""
-        text = re.sub(r"\n\s*\n+", "\n\n", text)
-        text = re.sub(r"(?<!\n)\n(?!\n)", " ", text)
-        return text
-
-    def normalize_text(self, text: str) -> str:
-        if not text:
-            return ""
+        self._fused = self._build_pattern()
+        self._steps = self._build_steps()
 
+    def _build_pattern(self):
+        """
+        Fuse every enabled rule into one alternation so the text is scanned once.
+        Group names select the replacement in _replace.
+        """
+        drop = [
+            pattern
+            for enabled, pattern in (
+                (self.remove_numbers, _NUMBER_PATTERN),
+                (self.remove_punctuation, _PUNCTUATION_PATTERN),
+                (self.remove_special_chars, _SPECIAL_CHARS_PATTERN),
+            )
+            if enabled
+        ]
+        drop_pattern = "|".join(drop)
+
+        groups = []
         if self.remove_urls:
-            text = self._replace_urls(text)
-
+            groups.append(f"(?P<url>{_URL_PATTERN})")
         if self.remove_emails:
-            text = self._replace_emails(text)
-
-        if self.remove_newlines:
-            text = self._normalize_newlines(text)
+            groups.append(f"(?P<email>{_EMAIL_PATTERN})")
 
+        if self.remove_extra_whitespace:
+            # Collapsing all whitespace supersedes newline normalisation. Runs of
+            # dropped characters between spaces are absorbed so removing them
+            # can't leave a double space behind
+            if drop:
+                groups.append(f"(?P<ws>{_WS_PATTERN}(?:(?:{drop_pattern})+[{_WS_CHARS}]*)*)")
+            else:
+                groups.append(f"(?P<ws>{_WS_PATTERN})")
+        elif self.remove_newlines:
+            # Keep paragraph breaks, join wrapped lines
+            groups.append(f"(?P<para>\\n[{_WS_CHARS}]*\\n+)")
+            groups.append("(?P<nl>\\n)")
+
+        if drop:
+            groups.append(f"(?P<drop>{drop_pattern})")
+
+        if not groups:
+            return None
+        return regex.compile("|".join(groups))
+
+    def _build_steps(self):
+        """
+        Resolve the flags once: the per-call work is just the enabled steps, in order.
+        """
+        steps = []
         if self.lowercase:
-            text = text.lower()
-        if self.remove_numbers:
-            text = self._remove_numbers(text)
-
-        if self.remove_punctuation:
-            text = self._remove_punctuation(text)
+            steps.append(str.lower)
+        if self._fused is not None:
+            steps.append(functools.partial(self._fused.sub, self._replace))
+        if self.strip_whitespace:
+            steps.append(str.strip)
+        return tuple(steps)
 
-        if self.remove_special_chars:
-            text = self._remove_special_chars(text)
+    @staticmethod
+    def _replace(match) -> str:
+        kind = match.lastgroup
+        if kind == "ws" or kind == "nl":
+            return " "
+        if kind == "para":
+            return "\n\n"
+        if kind == "drop":
+            return ""
+        return _PLACEHOLDERS[kind]
 
-        if self.remove_extra_whitespace:
-            text = self._remove_extra_whitespace(text)
+    def normalize_text(self, text: str) -> str:
+        if not text:
+            return ""
 
-        if self.strip_whitespace:
-            text = text.strip()
+        for step in self._steps:
+            text = step(text)
 
         return text
 
@@ -1,5 +1,42 @@
+import hashlib
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List
+from typing import Dict
+
+import numpy as np
+
+# Vectors are L2-normalised, so int8 uses a fixed symmetric scale of 1/127
+_INT8_SCALE = 127.0
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> np.ndarray:
+    """Store unit-normalised float vectors as float32, float16 or int8."""
+    if dtype == "float32":
+        return np.asarray(vectors, dtype=np.float32)
+    if dtype == "float16":
+        return np.asarray(vectors, dtype=np.float16)
+    if dtype == "int8":
+        scaled = np.clip(vectors, -1.0, 1.0) * _INT8_SCALE
+        return np.rint(scaled).astype(np.int8)
+    raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+
+def stack_float32(vectors: list, out: np.ndarray = None) -> np.ndarray:
+    """
+    Copy quantized row vectors into one contiguous float32 matrix (inverse of
+    quantize), for FAISS and other float32 consumers.
+    Fills `out` (at least len(vectors) rows) when given instead of allocating.
+    """
+    n = len(vectors)
+    if out is None:
+        out = np.empty((n, len(vectors[0]) if n else 0), dtype=np.float32)
+    buf = out[:n]
+
+    for i, vector in enumerate(vectors):
+        buf[i] = vector
+    if n and np.asarray(vectors[0]).dtype == np.int8:
+        buf /= _INT8_SCALE
+    return buf
 
 
 @dataclass(frozen=True)
@@ -7,7 +44,7 @@ class EmbeddingRecord:
     embedding_id: str  # usually == chunk_id
     chunk_id: str
     document_id: str
-    vector: List[float]
+    vector: np.ndarray  # row of a shared (N, D) float16/int8/float32 matrix
     embedding_model_id: str
     embedding_dim: int
 
@@ -18,34 +55,81 @@ class EmbeddingBatcher:
         model,
         embedding_model_id: str,
         batch_size: int = 64,
+        dtype: str = "float16",
+        cache_size: int = 100_000,
     ):
         self.model = model
         self.embedding_model_id = embedding_model_id
         self.batch_size = batch_size
+        self.dtype = dtype
 
-    def embed_chunks(self, chunks: list) -> list[EmbeddingRecord]:
-        records: list[EmbeddingRecord] = []
+        # Text digest -> quantized vector, LRU-bounded; boilerplate chunks repeated
+        # across documents are encoded once
+        self.cache_size = cache_size
+        self._cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+
+    def embed_matrix(self, chunks: list) -> np.ndarray:
+        """
+        Encode chunk texts into one contiguous (N, D) matrix, rows in input order.
+        Identical texts are only encoded once.
+        """
+        digests = [
+            hashlib.blake2b(c.text.encode("utf-8"), digest_size=16).digest() for c in chunks
+        ]
+
+        # One representative chunk per distinct text that isn't cached yet
+        missing = {}
+        for chunk, digest in zip(chunks, digests):
+            if digest not in self._cache and digest not in missing:
+                missing[digest] = chunk.text
+        self._encode_into_cache(missing)
 
-        for i in range(0, len(chunks), self.batch_size):
-            batch = chunks[i : i + self.batch_size]
-            texts = [c.text for c in batch]
+        if not chunks:
+            return np.empty((0, 0), dtype=np.dtype(self.dtype))
+
+        dim = len(self._cache[digests[0]])
+        matrix = np.empty((len(chunks), dim), dtype=np.dtype(self.dtype))
+        for pos, digest in enumerate(digests):
+            matrix[pos] = self._cache[digest]
+            self._cache.move_to_end(digest)
+
+        # Evict least recently used once this call's rows are copied out
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return matrix
+
+    def _encode_into_cache(self, texts: Dict[bytes, str]) -> None:
+        keys = list(texts)
+
+        # Batch texts of similar length together so the encoder pads less
+        keys.sort(key=lambda k: len(texts[k]))
+
+        for i in range(0, len(keys), self.batch_size):
+            window = keys[i : i + self.batch_size]
 
             vectors = self.model.encode(
-                texts,
+                [texts[k] for k in window],
                 show_progress_bar=False,
                 normalize_embeddings=True,
+                convert_to_numpy=True,
             )
 
-            for chunk, vector in zip(batch, vectors):
-                records.append(
-                    EmbeddingRecord(
-                        embedding_id=chunk.chunk_id,
-                        chunk_id=chunk.chunk_id,
-                        document_id=chunk.document_id,
-                        vector=vector.tolist(),
-                        embedding_model_id=self.embedding_model_id,
-                        embedding_dim=len(vector),
-                    )
-                )
-
-        return records
+            for key, vector in zip(window, quantize(vectors, self.dtype)):
+                self._cache[key] = vector
+
+    def embed_chunks(self, chunks: list) -> list[EmbeddingRecord]:
+        matrix = self.embed_matrix(chunks)
+
+        # Records hold views into the matrix, not per-vector copies
+        return [
+            EmbeddingRecord(
+                embedding_id=chunk.chunk_id,
+                chunk_id=chunk.chunk_id,
+                document_id=chunk.document_id,
+                vector=vector,
+                embedding_model_id=self.embedding_model_id,
+                embedding_dim=len(vector),
+            )
+            for chunk, vector in zip(chunks, matrix)
+        ]
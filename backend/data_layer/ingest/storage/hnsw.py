@@ -1,14 +1,28 @@
+import hashlib
+import mmap
 import os
+import struct
 from pathlib import Path
 
 import faiss
 import numpy as np
 
 try:
-    from .embedding import EmbeddingRecord
+    from .embedding import EmbeddingRecord, stack_float32
 except Exception as e:
     raise ImportError(f"The following exception occured: \n{e}")
 
+# Vector storage inside the HNSW graph: float32, or FAISS scalar quantizers
+# (fp16 halves memory, 8-bit quarters it)
+_ENCODERS = {"flat": None, "sqfp16": "SQfp16", "sq8": "SQ8"}
+_ENCODER_HEADER = "#encoder="
+
+
+def _faiss_id(embedding_id: str) -> int:
+    # Stable 63-bit id, so it can never be FAISS's -1 empty-slot marker
+    digest = hashlib.blake2b(embedding_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") & 0x7FFF_FFFF_FFFF_FFFF
+
 
 class HNSWIndex:
     def __init__(
@@ -18,50 +32,85 @@ class HNSWIndex:
         M: int = 32,
         ef_construction: int = 200,
         ef_search: int = 64,
+        encoder: str = "flat",
     ):
+        if encoder not in _ENCODERS:
+            raise ValueError(
+                f"Unknown encoder {encoder!r}, expected one of {sorted(_ENCODERS)}"
+            )
+
         self.dim = dim
         self.index_path = index_path
         self.M = M
         self.ef_construction = ef_construction
         self.ef_search = ef_search
+        self.encoder = encoder
 
-        self.index = faiss.IndexHNSWFlat(dim, M)
-        self.index.hnsw.efConstruction = ef_construction
-        self.index.hnsw.efSearch = ef_search
+        if encoder == "flat":
+            self._hnsw = faiss.IndexHNSWFlat(dim, M)
+        else:
+            self._hnsw = faiss.index_factory(dim, f"HNSW{M},{_ENCODERS[encoder]}")
+        self._hnsw.hnsw.efConstruction = ef_construction
+        self._hnsw.hnsw.efSearch = ef_search
 
-        # Map faiss IDs → embedding_ids
-        self.id_map: list[str] = []
+        # FAISS stores each vector under an int64 derived from its embedding_id,
+        # so search results need no positional id list
+        self.index = faiss.IndexIDMap2(self._hnsw)
 
-        # Track known IDs for idempotent ingestion
-        self._known_ids: set[str] = set()
+        # Let graph construction in add() use every core
+        faiss.omp_set_num_threads(os.cpu_count() or 1)
+
+        # float32 staging rows for add(), grown on demand and reused across calls
+        self._add_buf = np.empty((0, dim), dtype=np.float32)
+
+        # Map faiss IDs → embedding_ids; also tracks known IDs for idempotent ingestion
+        self.id_map: dict[int, str] = {}
 
     def add(self, embeddings: list[EmbeddingRecord]) -> None:
         if not embeddings:
             return
 
-        # Filter out duplicates and validate dimensions
-        valid_embeddings = []
-        for e in embeddings:
-            # Skip duplicates for idempotent ingestion
-            if e.embedding_id in self._known_ids:
-                continue
-
-            # Validate dimension
-            if len(e.vector) != self.dim:
-                raise ValueError(
-                    f"Embedding dimension mismatch: expected {self.dim}, "
-                    f"got {len(e.vector)} for ID {e.embedding_id}"
-                )
-
-            valid_embeddings.append(e)
-            self._known_ids.add(e.embedding_id)
-            self.id_map.append(e.embedding_id)
-
-        if not valid_embeddings:
+        if not isinstance(self.index, faiss.IndexIDMap2):
+            raise RuntimeError(
+                f"{self.index_path} predates id-mapped indexes and is read-only; "
+                f"rebuild it to add embeddings"
+            )
+
+        # Skip duplicates for idempotent ingestion; a repeat within the batch
+        # collapses onto one key
+        id_map = self.id_map
+        fresh = {
+            faiss_id: e
+            for faiss_id, e in zip(map(_faiss_id, (e.embedding_id for e in embeddings)), embeddings)
+            if faiss_id not in id_map
+        }
+
+        if not fresh:
             return
 
-        vectors = np.array([e.vector for e in valid_embeddings], dtype="float32")
-        self.index.add(vectors)
+        valid_embeddings = list(fresh.values())
+
+        # Validate dimensions before touching any state
+        bad = next((e for e in valid_embeddings if len(e.vector) != self.dim), None)
+        if bad is not None:
+            raise ValueError(
+                f"Embedding dimension mismatch: expected {self.dim}, "
+                f"got {len(bad.vector)} for ID {bad.embedding_id}"
+            )
+
+        id_map.update(zip(fresh, (e.embedding_id for e in valid_embeddings)))
+        faiss_ids = np.fromiter(fresh, dtype=np.int64, count=len(fresh))
+
+        n = len(valid_embeddings)
+        if len(self._add_buf) < n:
+            self._add_buf = np.empty((n, self.dim), dtype=np.float32)
+        # FAISS copies the rows into the index, so the buffer is free again afterwards
+        vectors = stack_float32([e.vector for e in valid_embeddings], out=self._add_buf)
+
+        # SQ8 learns per-dimension ranges, so train on the first batch
+        if not self.index.is_trained:
+            self.index.train(vectors)
+        self.index.add_with_ids(vectors, faiss_ids)
 
     def search(self, query_vector, k: int = 5) -> list[str]:
         # Validate query dimension
@@ -70,25 +119,31 @@ class HNSWIndex:
                 f"Query dimension mismatch: expected {self.dim}, got {len(query_vector)}"
             )
 
-        # Set efSearch dynamically based on k (industry standard)
-        self.index.hnsw.efSearch = max(self.ef_search, k * 4)
+        return self.search_batch([query_vector], k=k)[0]
 
-        vector = np.array([query_vector], dtype="float32")
+    def search_batch(self, query_vectors, k: int = 5) -> list[list[str]]:
+        """
+        Search a (B, dim) block of queries in one FAISS call.
+        Returns one list of embedding_ids per query.
+        """
+        # Own float32 copy, since it is normalised in place
+        vectors = np.array(query_vectors, dtype=np.float32, ndmin=2)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Query dimension mismatch: expected {self.dim}, got {vectors.shape[1]}"
+            )
 
-        # Normalize query vector for consistent cosine similarity
-        norm = np.linalg.norm(vector)
-        if norm > 0:
-            vector = vector / norm
+        # Set efSearch dynamically based on k (industry standard)
+        self._hnsw.hnsw.efSearch = max(self.ef_search, k * 4)
 
-        distances, indices = self.index.search(vector, k)
+        # Normalize query vectors for consistent cosine similarity (zero rows stay zero)
+        faiss.normalize_L2(vectors)
 
-        results = []
-        for idx in indices[0]:
-            if idx < 0:
-                continue
-            results.append(self.id_map[idx])
+        distances, indices = self.index.search(vectors, k)
 
-        return results
+        # The returned labels are the faiss ids themselves (-1 marks an empty slot)
+        id_map = self.id_map
+        return [[id_map[i] for i in row if i >= 0] for row in indices.tolist()]
 
     def save(self) -> None:
         self.index_path = Path(self.index_path)
@@ -104,30 +159,82 @@ class HNSWIndex:
         faiss.write_index(self.index, path_str)
 
         print(f"Saving index to: {path_str}")
-        with open(path_str + ".ids", "w") as f:
-            for eid in self.id_map:
-                f.write(eid[0] + "\n")
+        _write_ids(path_str + ".ids.bin", self.encoder, list(self.id_map.values()))
 
     def load(self) -> None:
         if not os.path.exists(self.index_path):
             return
 
-        self.index = faiss.read_index(self.index_path)
+        self.index = faiss.read_index(str(self.index_path))
         ids_path = str(self.index_path) + ".ids"
-        if not os.path.exists(ids_path):
+        if os.path.exists(ids_path + ".bin"):
+            self.encoder, embedding_ids = _read_ids(ids_path + ".bin")
+        elif os.path.exists(ids_path):
+            # Text mapping written by older versions
+            with open(ids_path) as f:
+                embedding_ids = [line.strip() for line in f]
+
+            # Files written before the header existed hold flat indexes
+            if embedding_ids and embedding_ids[0].startswith(_ENCODER_HEADER):
+                self.encoder = embedding_ids.pop(0)[len(_ENCODER_HEADER):]
+            else:
+                self.encoder = "flat"
+        else:
             raise FileNotFoundError(
-                f"ID mapping file not found: {ids_path}. "
+                f"ID mapping file not found: {ids_path}.bin. "
                 f"Index cannot be used without ID mapping."
             )
 
-        with open(ids_path) as f:
-            self.id_map = [line.strip() for line in f]
-
-        assert self.index.ntotal == len(self.id_map), (
+        assert self.index.ntotal == len(embedding_ids), (
             f"FAISS index and id_map size mismatch: "
             f"index has {self.index.ntotal} vectors, "
-            f"but id_map has {len(self.id_map)} IDs. "
+            f"but id_map has {len(embedding_ids)} IDs. "
             f"This indicates corruption or incomplete save/load."
         )
 
-        self._known_ids = set(self.id_map)
+        if isinstance(self.index, faiss.IndexIDMap2):
+            self._hnsw = faiss.downcast_index(self.index.index)
+            # The index keeps its labels in insertion order, same as the id file
+            labels = faiss.vector_to_array(self.index.id_map).tolist()
+            self.id_map = dict(zip(labels, embedding_ids))
+        else:
+            # Older indexes label vectors by insertion position
+            self._hnsw = self.index
+            self.id_map = dict(enumerate(embedding_ids))
+
+
+# Binary id file: <u4 count><u1 len><encoder> then <u2 byte length> per id,
+# then all ids back to back as UTF-8
+_IDS_HEADER = struct.Struct("<IB")
+
+
+def _write_ids(path: str, encoder: str, embedding_ids: list[str]) -> None:
+    encoded = [eid.encode() for eid in embedding_ids]
+    lengths = np.array([len(b) for b in encoded], dtype="<u2")
+    encoder_bytes = encoder.encode("ascii")
+
+    with open(path, "wb") as f:
+        f.write(_IDS_HEADER.pack(len(encoded), len(encoder_bytes)) + encoder_bytes)
+        f.write(lengths.tobytes())
+        f.write(b"".join(encoded))
+
+
+def _read_ids(path: str) -> tuple[str, list[str]]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        count, encoder_len = _IDS_HEADER.unpack_from(mm)
+        offset = _IDS_HEADER.size
+        encoder = mm[offset : offset + encoder_len].decode("ascii")
+        offset += encoder_len
+
+        ends = np.cumsum(
+            np.frombuffer(mm, dtype="<u2", count=count, offset=offset), dtype=np.int64
+        ).tolist()
+        offset += 2 * count
+        blob = mm[offset : offset + (ends[-1] if ends else 0)]
+
+    starts = [0] + ends[:-1]
+    text = blob.decode()
+    # Chunk ids are ASCII, where byte offsets are character offsets
+    if len(text) == len(blob):
+        return encoder, [text[a:b] for a, b in zip(starts, ends)]
+    return encoder, [blob[a:b].decode() for a, b in zip(starts, ends)]
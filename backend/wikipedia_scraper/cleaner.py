@@ -1,6 +1,35 @@
-import re
+import functools
 import logging
 
+try:
+    # RE2 matches in linear time, so adversarial markup can't make the scan backtrack
+    import re2 as regex
+
+    # RE2's \d and \s are ASCII-only; spell out the Unicode classes Python's re uses
+    _DIGIT = r"\p{Nd}"
+    _WS_CHARS = r"\t-\r\x1c-\x1f\x85\pZ"
+except ImportError:
+    import re as regex
+
+    _DIGIT = r"\d"
+    _WS_CHARS = r"\s"
+
+# Citations, templates and inline markup in one alternation, applied in a
+# single pass; deletions match no group, the rest keep their inner text
+_RE_MARKUP = regex.compile(
+    rf"\[(?:{_DIGIT}+|citation needed|clarification needed|when\?|verification needed)\]"
+    r"|\{\{[^}]+\}\}"
+    r"|\[\[(?:[^\]|]+\|)?(?P<link>[^\]]+)\]\]"
+    r"|'''(?P<bold>[^']+)'''"
+    r"|''(?P<italic>[^']+)''"
+)
+_RE_SPACES = regex.compile(r"[ \t]+")
+_RE_BLANK_LINES = regex.compile(r"\n{3,}")
+_RE_SENTENCE = regex.compile(rf"([.!?])[{_WS_CHARS}]*([A-Z])")
+
+# Headings and boilerplate fragments repeat across pages; long bodies rarely do
+_CACHE_MAX_CHARS = 2048
+
 
 class TextCleaner:
     """Conservative text cleaning without summarization"""
@@ -8,6 +37,7 @@ class TextCleaner:
     def __init__(self, config):
         self.config = config
         self.logger = logging.getLogger("Cleaner")
+        self._clean_cached = functools.lru_cache(maxsize=8192)(self._clean)
 
     def clean(self, text: str) -> str:
         """Clean text conservatively"""
@@ -15,41 +45,30 @@ class TextCleaner:
         if not text:
             return ""
 
+        if len(text) <= _CACHE_MAX_CHARS:
+            return self._clean_cached(text)
+
+        return self._clean(text)
+
+    def _clean(self, text: str) -> str:
         cleaned = text
 
-        cleaned = self._remove_citations(cleaned)
-        cleaned = self._remove_wiki_markup(cleaned)
+        cleaned = self._remove_markup(cleaned)
         cleaned = self._normalize_whitespace(cleaned)
         cleaned = self._preserve_sentence_boundaries(cleaned)
 
         return cleaned
 
-    def _remove_citations(self, text: str) -> str:
-        """Remove citation markers like [1], [2], [citation needed]"""
+    def _remove_markup(self, text: str) -> str:
+        """Remove citation markers like [1], [citation needed] and Wikipedia markup"""
 
-        text = re.sub(r"\[\d+\]", "", text)
-        text = re.sub(r"\[citation needed\]", "", text)
-        text = re.sub(r"\[clarification needed\]", "", text)
-        text = re.sub(r"\[when\?\]", "", text)
-        text = re.sub(r"\[verification needed\]", "", text)
-
-        return text
-
-    def _remove_wiki_markup(self, text: str) -> str:
-        """Remove Wikipedia markup"""
-
-        text = re.sub(r"\{\{[^}]+\}\}", "", text)
-        text = re.sub(r"\[\[([^\]|]+\|)?([^\]]+)\]\]", r"\2", text)
-        text = re.sub(r"'''([^']+)'''", r"\1", text)
-        text = re.sub(r"''([^']+)''", r"\1", text)
-
-        return text
+        return _RE_MARKUP.sub(_keep_inner, text)
 
     def _normalize_whitespace(self, text: str) -> str:
         """Normalize whitespace while preserving structure"""
 
-        text = re.sub(r"[ \t]+", " ", text)
-        text = re.sub(r"\n{3,}", "\n\n", text)
+        text = _RE_SPACES.sub(" ", text)
+        text = _RE_BLANK_LINES.sub("\n\n", text)
         text = text.strip()
 
         return text
@@ -57,9 +76,7 @@ class TextCleaner:
     def _preserve_sentence_boundaries(self, text: str) -> str:
         """Ensure proper sentence boundaries"""
 
-        text = re.sub(r"([.!?])\s*([A-Z])", r"\1 \2", text)
-
-        return text
+        return _RE_SENTENCE.sub(r"\1 \2", text)
 
     def clean_section(self, section: dict) -> dict:
         """Clean a section dictionary"""
@@ -69,3 +86,11 @@ class TextCleaner:
             "text": self.clean(section["text"]),
             "level": section["level"],
         }
+
+
+def _keep_inner(match) -> str:
+    inner = match.group("link") or match.group("bold") or match.group("italic")
+    if not inner:
+        return ""
+    # Markup nested inside a link or emphasis was cleaned by the earlier passes too
+    return _RE_MARKUP.sub(_keep_inner, inner)
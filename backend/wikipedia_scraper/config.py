@@ -8,11 +8,13 @@ class Config:
     # Output paths
     BASE_DIR = Path(__file__).parent
     OUTPUT_DIR = BASE_DIR.parent / "data" / "datasets" / "wikipedia_general"
+    PAGE_CACHE_DIR = BASE_DIR / "cache" / "pages"
 
     # Crawling parameters
     MAX_DEPTH = 2
     MAX_PAGES_PER_TOPIC = 50
     REQUEST_DELAY_SECONDS = 1.0
+    MAX_CONCURRENT_REQUESTS = 8
 
     # Wikipedia API
     WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
@@ -36,6 +38,7 @@ class Config:
     def validate(cls):
         """Validate configuration"""
         cls.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        cls.PAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
         if cls.MAX_DEPTH < 1:
             raise ValueError("MAX_DEPTH must be >= 1")
@@ -45,3 +48,6 @@ class Config:
 
         if cls.REQUEST_DELAY_SECONDS < 0.5:
             raise ValueError("REQUEST_DELAY_SECONDS must be >= 0.5 for API politeness")
+
+        if cls.MAX_CONCURRENT_REQUESTS < 1:
+            raise ValueError("MAX_CONCURRENT_REQUESTS must be >= 1")
@@ -1,148 +1,237 @@
 import requests
+import threading
 import time
-from typing import List, Set, Dict, Optional
+from collections import deque
+from typing import Iterator, List, Set, Dict, Tuple
 from urllib.parse import unquote
 import logging
 
 
+class TokenBucket:
+    """Thread-safe token bucket: bursts up to capacity, averages rate per second"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
 class WikipediaCrawler:
     """Wikipedia API-based crawler with depth limiting"""
 
+    # The API accepts at most 50 titles per query
+    TITLES_PER_QUERY = 50
+
     def __init__(self, config):
         self.config = config
         self.logger = logging.getLogger("WikiCrawler")
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": config.USER_AGENT})
+        # One keep-alive connection per concurrent caller, so topic threads
+        # don't open and discard extra sockets to the API host
+        self.session.mount(
+            "https://",
+            requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=config.MAX_CONCURRENT_REQUESTS
+            ),
+        )
         self.visited: Set[str] = set()
+        self.rate_limiter = TokenBucket(
+            rate=1.0 / config.REQUEST_DELAY_SECONDS,
+            capacity=config.MAX_CONCURRENT_REQUESTS,
+        )
 
     def crawl_topic(self, topic_id: str, seed_pages: List[str]) -> List[Dict]:
         """Crawl pages for a specific topic"""
 
+        return [
+            page
+            for batch in self.iter_crawl_topic(topic_id, seed_pages)
+            for page in batch
+        ]
+
+    def iter_crawl_topic(self, topic_id: str, seed_pages: List[str]) -> Iterator[List[Dict]]:
+        """Crawl pages for a specific topic, yielding each fetched batch as it arrives"""
+
         self.logger.info(f"Starting crawl for topic: {topic_id}")
         self.logger.info(f"Seed pages: {len(seed_pages)}")
 
-        pages_data = []
-        queue = [(page, 0) for page in seed_pages]
+        total = 0
+        queue = deque((page, 0) for page in seed_pages)
         visited_in_topic = set()
 
-        while queue and len(pages_data) < self.config.MAX_PAGES_PER_TOPIC:
-            page_title, depth = queue.pop(0)
+        while queue and total < self.config.MAX_PAGES_PER_TOPIC:
+            # Drain up to one API query's worth of titles, in queue order
+            depth_map = {}
+            room = self.config.MAX_PAGES_PER_TOPIC - total
+            while queue and len(depth_map) < min(room, self.TITLES_PER_QUERY):
+                page_title, depth = queue.popleft()
 
-            if page_title in visited_in_topic:
-                continue
-
-            if depth > self.config.MAX_DEPTH:
-                continue
-
-            visited_in_topic.add(page_title)
-
-            try:
-                page_data = self._fetch_page(page_title, topic_id, depth)
+                if page_title in visited_in_topic:
+                    continue
 
-                if page_data:
-                    pages_data.append(page_data)
-                    self.logger.info(
-                        f"[{topic_id}] Fetched: {page_title} "
-                        f"(depth={depth}, total={len(pages_data)}/{self.config.MAX_PAGES_PER_TOPIC})"
-                    )
+                if depth > self.config.MAX_DEPTH:
+                    continue
 
-                    if depth < self.config.MAX_DEPTH:
-                        links = self._extract_links(page_data["content"])
-                        for link in links[:10]:
-                            if link not in visited_in_topic:
-                                queue.append((link, depth + 1))
+                visited_in_topic.add(page_title)
+                depth_map[page_title] = depth
 
-                time.sleep(self.config.REQUEST_DELAY_SECONDS)
+            if not depth_map:
+                continue
 
+            try:
+                fetched = self._fetch_pages(list(depth_map), topic_id, depth_map)
             except Exception as e:
-                self.logger.error(f"Failed to fetch {page_title}: {e}")
+                self.logger.error(f"Failed to fetch {len(depth_map)} pages: {e}")
                 continue
 
-        self.logger.info(f"Completed crawl for {topic_id}: {len(pages_data)} pages")
-        return pages_data
-
-    def _fetch_page(self, title: str, topic_id: str, depth: int) -> Optional[Dict]:
-        """Fetch single page from Wikipedia API"""
-
+            batch = []
+            for page_data, links in fetched:
+                batch.append(page_data)
+                total += 1
+                self.logger.info(
+                    f"[{topic_id}] Fetched: {page_data['title']} "
+                    f"(depth={page_data['depth']}, total={total}/{self.config.MAX_PAGES_PER_TOPIC})"
+                )
+
+                if page_data["depth"] < self.config.MAX_DEPTH:
+                    for link in links[:10]:
+                        if link not in visited_in_topic:
+                            queue.append((link, page_data["depth"] + 1))
+
+            # Links are queued first, so the caller can work on this batch
+            # while the next one is fetched
+            if batch:
+                yield batch
+
+        self.logger.info(f"Completed crawl for {topic_id}: {total} pages")
+
+    def _fetch_pages(self, titles: List[str], topic_id: str, depth_map: Dict[str, int]) -> List[Tuple[Dict, List[str]]]:
+        """Fetch up to TITLES_PER_QUERY pages, with their article links, from Wikipedia API"""
+
+        # Plain-text extracts keep "== heading ==" lines for the extractor but
+        # carry no templates, refs or tables. The API serves whole-article
+        # extracts one per response, so the rest of the batch comes through
+        # excontinue below, while info and links arrive for all titles at once
         params = {
             "action": "query",
             "format": "json",
-            "titles": title,
+            "titles": "|".join(titles),
             "prop": "extracts|info",
-            "exintro": False,
-            "explaintext": False,
+            "explaintext": 1,
+            "exsectionformat": "wiki",
+            "exlimit": "max",
             "inprop": "url",
             "redirects": 1,
         }
 
-        response = self.session.get(
-            self.config.WIKIPEDIA_API_URL, params=params, timeout=30
-        )
+        # Links come back in the same query; only ask when some page will be expanded
+        if min(depth_map.values()) < self.config.MAX_DEPTH:
+            params["prop"] += "|links"
+            params["pllimit"] = "max"
+            params["plnamespace"] = 0
 
-        if response.status_code != 200:
-            raise RuntimeError(
-                f"Wikipedia API returned status {response.status_code} for {title}"
-            )
-
-        data = response.json()
-
-        pages = data.get("query", {}).get("pages", {})
-
-        if not pages:
-            self.logger.warning(f"No pages returned for {title}")
-            return None
-
-        page_id = list(pages.keys())[0]
-
-        if page_id == "-1":
-            self.logger.warning(f"Page not found: {title}")
-            return None
-
-        page = pages[page_id]
-
-        if "extract" not in page:
-            self.logger.warning(f"No extract for {title}")
-            return None
-
-        return {
-            "title": page.get("title", title),
-            "pageid": page_id,
-            "url": page.get("fullurl", ""),
-            "content": page.get("extract", ""),
-            "topic_id": topic_id,
-            "depth": depth,
-        }
-
-    def _extract_links(self, content: str) -> List[str]:
-        """Extract Wikipedia links from content"""
+        normalized = {}
+        redirects = {}
+        pages = {}
+        continuation = {}
 
-        params = {
-            "action": "parse",
-            "format": "json",
-            "text": content[:5000],
-            "prop": "links",
-            "contentmodel": "wikitext",
-        }
+        # Extracts and long link lists spill into continuation requests;
+        # modules already complete are not resent
+        while True:
+            # One token per HTTP request keeps the politeness delay
+            self.rate_limiter.acquire()
 
-        try:
             response = self.session.get(
-                self.config.WIKIPEDIA_API_URL, params=params, timeout=30
+                self.config.WIKIPEDIA_API_URL,
+                params={**params, **continuation},
+                timeout=30,
             )
 
             if response.status_code != 200:
-                return []
+                raise RuntimeError(
+                    f"Wikipedia API returned status {response.status_code} for {len(titles)} titles"
+                )
 
             data = response.json()
-            links = data.get("parse", {}).get("links", [])
+            query = data.get("query", {})
+
+            normalized.update((n["from"], n["to"]) for n in query.get("normalized", []))
+            redirects.update((r["from"], r["to"]) for r in query.get("redirects", []))
+
+            for page_id, page in query.get("pages", {}).items():
+                merged = pages.setdefault(page_id, page)
+                if merged is page:
+                    continue
+                merged.setdefault("links", []).extend(page.get("links", []))
+                # Each page's extract arrives in its own excontinue response
+                if "extract" in page and not merged.get("extract"):
+                    merged["extract"] = page["extract"]
+
+            if "continue" not in data:
+                break
+            continuation = data["continue"]
+
+        # Requested titles come back normalized and redirect-resolved
+        by_title = {page.get("title"): (page_id, page) for page_id, page in pages.items()}
+
+        results = []
+        seen = set()
+        for title in titles:
+            resolved = normalized.get(title, title)
+            resolved = redirects.get(resolved, resolved)
+
+            if resolved not in by_title:
+                self.logger.warning(f"No pages returned for {title}")
+                continue
+
+            page_id, page = by_title[resolved]
+
+            if page_id.startswith("-"):
+                self.logger.warning(f"Page not found: {title}")
+                continue
+
+            if resolved in seen:
+                continue
+            seen.add(resolved)
+
+            extract = page.get("extract")
+            if not extract:
+                self.logger.warning(f"No content for {title}")
+                continue
 
-            internal_links = [
-                link["*"]
-                for link in links
-                if link.get("ns") == 0 and not link["*"].startswith("List of")
+            page_data = {
+                "title": page.get("title", title),
+                "pageid": page_id,
+                "url": page.get("fullurl", ""),
+                "content": extract,
+                "topic_id": topic_id,
+                "depth": depth_map[title],
+            }
+
+            links = [
+                link["title"]
+                for link in page.get("links", [])
+                if not link["title"].startswith("List of")
             ]
 
-            return internal_links[:20]
+            results.append((page_data, links))
 
-        except Exception as e:
-            self.logger.debug(f"Link extraction failed: {e}")
-            return []
+        return results
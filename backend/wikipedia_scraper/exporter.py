@@ -1,9 +1,12 @@
 import json
+from concurrent.futures import Executor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 import logging
 
+from topic_assigner import PageRecord
+
 
 class DataExporter:
     """Export scraped data as PDFs with metadata"""
@@ -38,18 +41,47 @@ class DataExporter:
             self.TA_LEFT = TA_LEFT
             self.TA_CENTER = TA_CENTER
 
+            # Styles are the same for every page, so build them once
+            styles = self.getSampleStyleSheet()
+
+            self._style_title = self.ParagraphStyle(
+                "CustomTitle",
+                parent=styles["Heading1"],
+                fontSize=self.config.PDF_TITLE_SIZE,
+                alignment=self.TA_CENTER,
+                spaceAfter=12,
+            )
+
+            self._style_section = self.ParagraphStyle(
+                "CustomSection",
+                parent=styles["Heading2"],
+                fontSize=self.config.PDF_SECTION_SIZE,
+                spaceAfter=6,
+            )
+
+            self._style_body = self.ParagraphStyle(
+                "CustomBody",
+                parent=styles["BodyText"],
+                fontSize=self.config.PDF_FONT_SIZE,
+                alignment=self.TA_LEFT,
+                spaceAfter=12,
+            )
+
+            self._style_url = styles["Italic"]
+            self._xml_escape = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
         except ImportError:
             raise ImportError(
                 "reportlab is required for PDF export. Install with: pip install reportlab"
             )
 
-    def export(self, data: Dict, topic_id: str) -> Path:
+    def export(self, data: PageRecord, topic_id: str) -> Path:
         """Export page data as PDF with metadata"""
 
         topic_dir = self.config.OUTPUT_DIR / topic_id
         topic_dir.mkdir(parents=True, exist_ok=True)
 
-        safe_filename = self._sanitize_filename(data["title"])
+        safe_filename = self._sanitize_filename(data.title)
         pdf_path = topic_dir / f"{safe_filename}.pdf"
         metadata_path = topic_dir / f"{safe_filename}_metadata.json"
 
@@ -60,7 +92,27 @@ class DataExporter:
 
         return pdf_path
 
-    def _create_pdf(self, data: Dict, pdf_path: Path):
+    def export_many(
+        self, all_data: Iterable[PageRecord], topic_id: str, executor: Executor
+    ) -> List[Optional[Path]]:
+        """Export many pages as PDFs on a worker pool shared by all topics"""
+
+        # map() reads all of all_data before returning, but submits each chunk
+        # as it is read, so pages produced by a generator start exporting
+        # before the generator is exhausted
+        args = ((data, topic_id, self.config) for data in all_data)
+        return list(executor.map(_export_one, args, chunksize=8))
+
+    def _try_export(self, data: PageRecord, topic_id: str) -> Optional[Path]:
+        """Export one page, logging a failure instead of raising"""
+
+        try:
+            return self.export(data, topic_id)
+        except Exception as e:
+            self.logger.error(f"Failed to export {data.title}: {e}")
+            return None
+
+    def _create_pdf(self, data: PageRecord, pdf_path: Path):
         """Create PDF from page data"""
 
         doc = self.SimpleDocTemplate(
@@ -72,44 +124,19 @@ class DataExporter:
             bottomMargin=self.config.PDF_MARGIN,
         )
 
-        styles = self.getSampleStyleSheet()
-
-        title_style = self.ParagraphStyle(
-            "CustomTitle",
-            parent=styles["Heading1"],
-            fontSize=self.config.PDF_TITLE_SIZE,
-            alignment=self.TA_CENTER,
-            spaceAfter=12,
-        )
-
-        section_style = self.ParagraphStyle(
-            "CustomSection",
-            parent=styles["Heading2"],
-            fontSize=self.config.PDF_SECTION_SIZE,
-            spaceAfter=6,
-        )
-
-        body_style = self.ParagraphStyle(
-            "CustomBody",
-            parent=styles["BodyText"],
-            fontSize=self.config.PDF_FONT_SIZE,
-            alignment=self.TA_LEFT,
-            spaceAfter=12,
-        )
-
         story = []
 
-        title = self.Paragraph(data["title"], title_style)
+        title = self.Paragraph(data.title, self._style_title)
         story.append(title)
         story.append(self.Spacer(1, 0.2 * self.inch))
 
-        url_text = f"<i>Source: {data['url']}</i>"
-        url_para = self.Paragraph(url_text, styles["Italic"])
+        url_text = f"<i>Source: {data.url}</i>"
+        url_para = self.Paragraph(url_text, self._style_url)
         story.append(url_para)
         story.append(self.Spacer(1, 0.3 * self.inch))
 
-        for section in data["sections"]:
-            heading = self.Paragraph(section["heading"], section_style)
+        for section in data.sections:
+            heading = self.Paragraph(section["heading"], self._style_section)
             story.append(heading)
 
             text = section["text"]
@@ -117,31 +144,26 @@ class DataExporter:
 
             for para in paragraphs:
                 if para.strip():
-                    safe_para = (
-                        para.replace("&", "&amp;")
-                        .replace("<", "&lt;")
-                        .replace(">", "&gt;")
-                    )
-                    p = self.Paragraph(safe_para, body_style)
+                    p = self.Paragraph(para.translate(self._xml_escape), self._style_body)
                     story.append(p)
 
             story.append(self.Spacer(1, 0.2 * self.inch))
 
         doc.build(story)
 
-    def _create_metadata(self, data: Dict, metadata_path: Path):
+    def _create_metadata(self, data: PageRecord, metadata_path: Path):
         """Create metadata JSON file"""
 
         metadata = {
-            "title": data["title"],
-            "wikipedia_url": data["url"],
-            "primary_topic_id": data["primary_topic_id"],
-            "secondary_topics": data["secondary_topics"],
-            "crawl_depth": data["depth"],
+            "title": data.title,
+            "wikipedia_url": data.url,
+            "primary_topic_id": data.primary_topic_id,
+            "secondary_topics": data.secondary_topics,
+            "crawl_depth": data.depth,
             "retrieved_timestamp": self.config.SCRAPE_TIMESTAMP,
             "source": self.config.SOURCE_NAME,
-            "num_sections": len(data["sections"]),
-            "section_headings": [s["heading"] for s in data["sections"]],
+            "num_sections": len(data.sections),
+            "section_headings": [s["heading"] for s in data.sections],
         }
 
         with open(metadata_path, "w", encoding="utf-8") as f:
@@ -186,3 +208,15 @@ class DataExporter:
             json.dump(summary, f, indent=2, ensure_ascii=False)
 
         self.logger.info(f"Exported summary to {output_path}")
+
+
+# One exporter per worker process, so reportlab styles are built once per process
+_worker_exporter = None
+
+
+def _export_one(args) -> Optional[Path]:
+    global _worker_exporter
+    data, topic_id, config = args
+    if _worker_exporter is None:
+        _worker_exporter = DataExporter(config)
+    return _worker_exporter._try_export(data, topic_id)
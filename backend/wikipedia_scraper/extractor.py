@@ -2,6 +2,23 @@ import re
 from typing import Dict, List
 import logging
 
+# Heading lines like "== History ==", matched anywhere in the page in one pass
+_RE_HEADING = re.compile(r"^[^\S\n]*(={2,6})[^\S\n]*(.+?)[^\S\n]*\1[^\S\n]*$", re.M)
+
+# Back-matter headings dropped from every page; built once, not per heading
+_INVALID_SECTIONS = frozenset(
+    {
+        "references",
+        "external links",
+        "see also",
+        "notes",
+        "bibliography",
+        "further reading",
+        "sources",
+        "footnotes",
+    }
+)
+
 
 class ContentExtractor:
     """Extract structured content from Wikipedia HTML/text"""
@@ -38,71 +55,43 @@ class ContentExtractor:
     def _extract_sections(self, content: str) -> List[Dict]:
         """Extract sections from content"""
 
-        lines = content.split("\n")
         sections = []
-        current_section = None
-        current_text = []
-
-        for line in lines:
-            line = line.strip()
+        matches = list(_RE_HEADING.finditer(content))
+        ends = [m.start() for m in matches] + [len(content)]
 
-            if not line:
-                continue
+        # One scan finds the headings; section bodies are the slices between them
+        blocks = [(None, content[: ends[0]])]
+        blocks += [(m, content[m.end() : end]) for m, end in zip(matches, ends[1:])]
 
-            heading_match = re.match(r"^(={2,6})\s*(.+?)\s*\1$", line)
+        for match, body in blocks:
+            paragraphs = [
+                line
+                for line in map(str.strip, body.split("\n"))
+                if line and len(line) >= self.config.MIN_PARAGRAPH_LENGTH
+            ]
 
-            if heading_match:
-                if current_section and current_text:
-                    current_section["text"] = "\n\n".join(current_text)
-                    if len(current_section["text"]) >= self.config.MIN_SECTION_LENGTH:
-                        sections.append(current_section)
-
-                level = len(heading_match.group(1))
-                heading = heading_match.group(2).strip()
+            if not paragraphs:
+                continue
 
-                if self._is_valid_section(heading):
-                    current_section = {"heading": heading, "text": "", "level": level}
-                    current_text = []
-                else:
-                    current_section = None
-                    current_text = []
+            heading = match.group(2).strip() if match else None
 
-            elif current_section is not None:
-                if len(line) >= self.config.MIN_PARAGRAPH_LENGTH:
-                    current_text.append(line)
+            if heading is not None and self._is_valid_section(heading):
+                section = {"heading": heading, "text": "", "level": len(match.group(1))}
+            elif not sections:
+                # Text before any kept section reads as the introduction
+                section = {"heading": "Introduction", "text": "", "level": 1}
             else:
-                if len(line) >= self.config.MIN_PARAGRAPH_LENGTH:
-                    if not sections:
-                        current_section = {
-                            "heading": "Introduction",
-                            "text": "",
-                            "level": 1,
-                        }
-                        current_text = [line]
-                    else:
-                        current_text.append(line)
-
-        if current_section and current_text:
-            current_section["text"] = "\n\n".join(current_text)
-            if len(current_section["text"]) >= self.config.MIN_SECTION_LENGTH:
-                sections.append(current_section)
+                continue
+
+            section["text"] = "\n\n".join(paragraphs)
+            if len(section["text"]) >= self.config.MIN_SECTION_LENGTH:
+                sections.append(section)
 
         return sections
 
     def _is_valid_section(self, heading: str) -> bool:
         """Check if section heading is valid for inclusion"""
 
-        invalid_sections = {
-            "references",
-            "external links",
-            "see also",
-            "notes",
-            "bibliography",
-            "further reading",
-            "sources",
-            "footnotes",
-        }
-
         heading_lower = heading.lower().strip()
 
-        return heading_lower not in invalid_sections
+        return heading_lower not in _INVALID_SECTIONS
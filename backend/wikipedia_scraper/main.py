@@ -4,8 +4,15 @@ Wikipedia Scraper for RAG-TCRL-X
 Produces topic-aware, clean Wikipedia corpus
 """
 
+import dataclasses
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
@@ -15,7 +22,7 @@ from seeds import WikipediaSeeds
 from crawler import WikipediaCrawler
 from extractor import ContentExtractor
 from cleaner import TextCleaner
-from topic_assigner import TopicAssigner
+from topic_assigner import PageRecord, TopicAssigner
 from exporter import DataExporter
 
 
@@ -35,6 +42,156 @@ def setup_logging():
     )
 
 
+# Bump when extract/clean/assign logic changes so cached pages are not reused
+_PAGE_PIPELINE_VERSION = "1"
+
+# Per-process page pipeline, built once by _init_page_worker
+_extractor = None
+_cleaner = None
+_topic_assigner = None
+_page_cache_dir = None
+
+
+def _init_page_worker(config):
+    global _extractor, _cleaner, _topic_assigner, _page_cache_dir
+    setup_logging()
+    _page_cache_dir = config.PAGE_CACHE_DIR
+    _extractor = ContentExtractor(config)
+    _cleaner = TextCleaner(config)
+    _topic_assigner = TopicAssigner(config)
+
+
+def process_page(page_data):
+    """Extract, clean and assign topics for one page; None if nothing is left"""
+
+    logger = logging.getLogger("Main")
+    topic_id = page_data["topic_id"]
+
+    # A re-run over unchanged pages loads the previous result instead
+    fingerprint = _page_fingerprint(page_data)
+    cached = _read_page_cache(fingerprint)
+    if cached is not None:
+        return cached
+
+    try:
+        extracted = _extractor.extract(page_data)
+
+        # Clean and drop empty sections in one pass; isspace() tests without copying
+        extracted["sections"] = [
+            s
+            for s in map(_cleaner.clean_section, extracted["sections"])
+            if s["text"] and not s["text"].isspace()
+        ]
+
+        if not extracted["sections"]:
+            logger.warning(
+                f"[{topic_id}] No valid sections for {extracted['title']}, skipping"
+            )
+            return None
+
+        assigned = _topic_assigner.assign(extracted)
+        _write_page_cache(fingerprint, assigned)
+        return assigned
+
+    except Exception as e:
+        logger.error(
+            f"[{topic_id}] Failed to process {page_data.get('title', 'unknown')}: {e}"
+        )
+        return None
+
+
+def _page_fingerprint(page_data) -> str:
+    """Hash of everything the page result depends on, plus the pipeline version"""
+    h = hashlib.blake2b(digest_size=16)
+    fields = [
+        _PAGE_PIPELINE_VERSION,
+        page_data["title"],
+        page_data["url"],
+        page_data["topic_id"],
+        page_data["depth"],
+    ]
+    h.update(json.dumps(fields).encode("utf-8"))
+    h.update(page_data["content"].encode("utf-8"))
+    return h.hexdigest()
+
+
+def _read_page_cache(fingerprint: str):
+    cache_path = _page_cache_dir / f"{fingerprint}.json"
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            return PageRecord(**json.load(file))
+    except FileNotFoundError:
+        return None
+
+
+def _write_page_cache(fingerprint: str, assigned: PageRecord) -> None:
+    cache_path = _page_cache_dir / f"{fingerprint}.json"
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(dataclasses.asdict(assigned), file, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+
+def process_topic(topic_id, crawler, page_pool, export_pool, exporter):
+    """Crawl, extract, clean, assign and export one topic; returns page summaries"""
+
+    logger = logging.getLogger("Main")
+
+    logger.info(f"[{topic_id}] Starting topic")
+
+    seeds = WikipediaSeeds.get_seeds_for_topic(topic_id)
+
+    # Extract/clean/assign is pure CPU work, so pages go to the process pool as
+    # soon as their batch is fetched, overlapping with the rest of the crawl
+    pending = []
+    for batch in crawler.iter_crawl_topic(topic_id, seeds):
+        pending.extend(
+            (page_data["title"], page_pool.submit(process_page, page_data))
+            for page_data in batch
+        )
+
+    if not pending:
+        logger.warning(f"[{topic_id}] No pages crawled")
+        return []
+
+    logger.info(f"[{topic_id}] Processing {len(pending)} pages...")
+
+    assigned_pages = []
+
+    def ready_pages():
+        for title, future in pending:
+            # Anything process_page lets escape (a corrupt cache file, a dead
+            # worker) costs this page only, not the topic
+            try:
+                assigned = future.result()
+            except Exception as e:
+                logger.error(f"[{topic_id}] Failed to process {title}: {e}")
+                continue
+            if assigned is not None:
+                assigned_pages.append(assigned)
+                yield assigned
+
+    # PDF builds are CPU-bound, so the topic's pages export in parallel.
+    # Executor.map drains the generator before it returns, but each page is
+    # submitted as soon as its future resolves, so early pages export while
+    # later ones are still being processed
+    exported = exporter.export_many(ready_pages(), topic_id, export_pool)
+
+    logger.info(f"✓ Completed {topic_id}: {len(pending)} pages processed")
+
+    # Section texts are in the PDFs now; only the light summary travels on
+    return [
+        {
+            "title": assigned.title,
+            "primary_topic_id": assigned.primary_topic_id,
+            "secondary_topics": assigned.secondary_topics,
+            "n_sections": len(assigned.sections),
+        }
+        for assigned, pdf_path in zip(assigned_pages, exported)
+        if pdf_path is not None
+    ]
+
+
 def main():
     """Main scraping pipeline"""
 
@@ -52,9 +209,6 @@ def main():
         logger.info("✓ Configuration valid")
 
         crawler = WikipediaCrawler(Config)
-        extractor = ContentExtractor(Config)
-        cleaner = TextCleaner(Config)
-        topic_assigner = TopicAssigner(Config)
         exporter = DataExporter(Config)
 
         all_processed_data = []
@@ -62,54 +216,44 @@ def main():
         topics = WikipediaSeeds.get_all_topics()
         logger.info(f"Topics to scrape: {len(topics)}")
 
-        for topic_idx, topic_id in enumerate(topics, 1):
-            logger.info("")
-            logger.info("=" * 80)
-            logger.info(f"TOPIC {topic_idx}/{len(topics)}: {topic_id}")
-            logger.info("=" * 80)
-
-            seeds = WikipediaSeeds.get_seeds_for_topic(topic_id)
-
-            raw_pages = crawler.crawl_topic(topic_id, seeds)
-
-            if not raw_pages:
-                logger.warning(f"No pages crawled for {topic_id}")
-                continue
-
-            logger.info(f"Processing {len(raw_pages)} pages for {topic_id}...")
-
-            for page_data in raw_pages:
-                try:
-                    extracted = extractor.extract(page_data)
-
-                    cleaned_sections = [
-                        cleaner.clean_section(section)
-                        for section in extracted["sections"]
-                    ]
-
-                    extracted["sections"] = [
-                        s for s in cleaned_sections if s["text"].strip()
-                    ]
-
-                    if not extracted["sections"]:
-                        logger.warning(
-                            f"No valid sections for {extracted['title']}, skipping"
-                        )
-                        continue
-
-                    assigned = topic_assigner.assign(extracted)
-
-                    exporter.export(assigned, topic_id)
-
-                    all_processed_data.append(assigned)
-
-                except Exception as e:
-                    logger.error(
-                        f"Failed to process {page_data.get('title', 'unknown')}: {e}"
-                    )
-                    continue
-
-            logger.info(f"✓ Completed {topic_id}: {len(raw_pages)} pages processed")
+        # Topics are network-bound on the crawl, so crawl several at once;
+        # the crawler's shared rate limiter keeps the overall request rate
+        results = {}
+        workers = max(1, min(len(topics), Config.MAX_CONCURRENT_REQUESTS))
+        # One page pool and one export pool shared by all topic threads; spawned
+        # rather than forked because the topic threads are already running when
+        # they start workers
+        records_path = Config.OUTPUT_DIR / "records.jsonl"
+        spawn = multiprocessing.get_context("spawn")
+        with (
+            ProcessPoolExecutor(
+                initializer=_init_page_worker,
+                initargs=(Config,),
+                mp_context=spawn,
+            ) as page_pool,
+            ProcessPoolExecutor(initializer=setup_logging, mp_context=spawn) as export_pool,
+            ThreadPoolExecutor(max_workers=workers) as executor,
+            open(records_path, "w", encoding="utf-8") as records,
+        ):
+            futures = {
+                executor.submit(
+                    process_topic, topic_id, crawler, page_pool, export_pool, exporter
+                ): topic_id
+                for topic_id in topics
+            }
+
+            for done, future in enumerate(as_completed(futures), 1):
+                topic_id = futures[future]
+                results[topic_id] = future.result()
+                # Stream each finished topic's records out as it completes
+                records.writelines(
+                    json.dumps(record, ensure_ascii=False) + "\n"
+                    for record in results[topic_id]
+                )
+                logger.info(f"TOPIC {done}/{len(topics)} done: {topic_id}")
+
+        for topic_id in topics:
+            all_processed_data.extend(results[topic_id])
 
         logger.info("")
         logger.info("=" * 80)
@@ -122,11 +266,9 @@ def main():
         logger.info(f"Total pages scraped: {len(all_processed_data)}")
         logger.info(f"Output directory: {Config.OUTPUT_DIR}")
         logger.info(f"Summary: {summary_path}")
+        logger.info(f"Page records: {records_path}")
 
-        topic_counts = {}
-        for data in all_processed_data:
-            topic_id = data["primary_topic_id"]
-            topic_counts[topic_id] = topic_counts.get(topic_id, 0) + 1
+        topic_counts = Counter(data["primary_topic_id"] for data in all_processed_data)
 
         logger.info("")
         logger.info("Pages per topic:")
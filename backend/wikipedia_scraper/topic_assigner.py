@@ -1,5 +1,28 @@
-from typing import List, Set
+from dataclasses import dataclass
+from typing import FrozenSet, List
+import functools
 import logging
+import re
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+_RE_WORD = re.compile(r"\w+")
+
+
+@dataclass(slots=True)
+class PageRecord:
+    """An extracted, cleaned page with its topic assignment"""
+
+    title: str
+    url: str
+    topic_id: str
+    depth: int
+    sections: list
+    primary_topic_id: str
+    secondary_topics: list
 
 
 class TopicAssigner:
@@ -10,48 +33,87 @@ class TopicAssigner:
         self.logger = logging.getLogger("TopicAssigner")
 
         self.topic_keywords = {
-            "cardiovascular": {
+            "cardiovascular": [
                 "heart",
                 "cardiac",
+                "coronary",
                 "vascular",
                 "arterial",
-                "coronary",
                 "myocardial",
-            },
-            "cancer": {
+            ],
+            "cancer": [
                 "cancer",
-                "carcinoma",
                 "tumor",
                 "malignant",
-                "oncology",
+                "carcinoma",
                 "metastasis",
-            },
-            "respiratory": {"lung", "pulmonary", "respiratory", "breathing", "asthma"},
-            "diabetes": {"diabetes", "diabetic", "insulin", "glucose", "glycemic"},
-            "infectious_disease": {
+                "oncology",
+            ],
+            "respiratory": ["lung", "respiratory", "breathing", "pulmonary", "asthma"],
+            "diabetes": ["diabetes", "insulin", "glucose", "diabetic", "glycemic"],
+            "infectious_disease": [
                 "infection",
-                "infectious",
-                "pathogen",
-                "bacteria",
                 "virus",
+                "bacteria",
+                "infectious",
                 "viral",
-            },
-            "mental_health": {
+                "pathogen",
+            ],
+            "mental_health": [
                 "mental",
-                "psychiatric",
-                "psychological",
                 "depression",
                 "anxiety",
-            },
-            "public_health": {
+                "psychological",
+                "psychiatric",
+            ],
+            "public_health": [
                 "public health",
                 "prevention",
-                "health policy",
                 "epidemiology",
-            },
+                "health policy",
+            ],
+        }
+
+        # Every keyword of every topic in one automaton, so a single pass over
+        # the text finds all hits
+        self.automaton = None
+        if ahocorasick is not None:
+            keyword_topics = {}
+            for topic_id, keywords in self.topic_keywords.items():
+                for keyword in keywords:
+                    keyword_topics.setdefault(keyword, []).append(topic_id)
+
+            self.automaton = ahocorasick.Automaton()
+            for keyword, topic_ids in keyword_topics.items():
+                self.automaton.add_word(keyword, (tuple(topic_ids), len(keyword)))
+            self.automaton.make_automaton()
+
+        # Without the automaton, single-word keywords are looked up as hash sets.
+        # Keywords must start a word ("mental" is not in "environmental") but may
+        # carry a suffix, so plurals still count: a word matches when one of its
+        # prefixes is a keyword
+        self.single_keywords = {
+            topic_id: frozenset(k for k in keywords if " " not in k)
+            for topic_id, keywords in self.topic_keywords.items()
         }
+        self.keyword_lengths = sorted(
+            {len(k) for keywords in self.single_keywords.values() for k in keywords}
+        )
 
-    def assign(self, extracted_data: dict) -> dict:
+        # Multi-word keywords ("public health") are matched as phrases instead
+        self.phrase_patterns = {
+            topic_id: re.compile(
+                r"\b(?:" + "|".join(re.escape(k) for k in keywords if " " in k) + ")",
+                re.IGNORECASE,
+            )
+            for topic_id, keywords in self.topic_keywords.items()
+            if any(" " in k for k in keywords)
+        }
+
+        # Pages shared between topics repeat the same lead text; classify it once
+        self._classify_cached = functools.lru_cache(maxsize=4096)(self._classify)
+
+    def assign(self, extracted_data: dict) -> PageRecord:
         """Assign topics to extracted page data"""
 
         primary_topic = extracted_data["topic_id"]
@@ -60,9 +122,15 @@ class TopicAssigner:
             extracted_data, exclude=primary_topic
         )
 
-        assigned = extracted_data.copy()
-        assigned["primary_topic_id"] = primary_topic
-        assigned["secondary_topics"] = list(secondary_topics)
+        assigned = PageRecord(
+            title=extracted_data["title"],
+            url=extracted_data["url"],
+            topic_id=extracted_data["topic_id"],
+            depth=extracted_data["depth"],
+            sections=extracted_data["sections"],
+            primary_topic_id=primary_topic,
+            secondary_topics=list(secondary_topics),
+        )
 
         self.logger.debug(
             f"{extracted_data['title']}: primary={primary_topic}, "
@@ -71,22 +139,63 @@ class TopicAssigner:
 
         return assigned
 
-    def _find_secondary_topics(self, data: dict, exclude: str) -> Set[str]:
+    def _find_secondary_topics(self, data: dict, exclude: str) -> FrozenSet[str]:
         """Find secondary topics based on content"""
 
-        text_to_analyze = data["title"].lower()
+        parts = [data["title"]]
 
         for section in data.get("sections", []):
-            text_to_analyze += " " + section.get("heading", "").lower()
-            text_to_analyze += " " + section.get("text", "")[:500].lower()
+            parts.append(section.get("heading", ""))
+            parts.append(section.get("text", "")[:500])
+
+        # One join over the whole buffer instead of repeated +=
+        text_to_analyze = " ".join(parts)
+
+        # Cached results are immutable, so they are handed out without a copy
+        return self._classify_cached(text_to_analyze, exclude)
+
+    def _classify(self, text_to_analyze: str, exclude: str) -> FrozenSet[str]:
+        """Topics other than exclude whose keywords occur in the text"""
 
         secondary = set()
 
-        for topic_id, keywords in self.topic_keywords.items():
-            if topic_id == exclude:
+        if self.automaton is not None:
+            # The automaton is case-sensitive, so it scans a lowered copy
+            text = text_to_analyze.lower()
+            candidates = len(self.topic_keywords.keys() - {exclude})
+            for end, (topic_ids, length) in self.automaton.iter(text):
+                start = end - length + 1
+                if start and (text[start - 1].isalnum() or text[start - 1] == "_"):
+                    continue  # same word-start rule as the fallback below
+                secondary.update(topic_ids)
+                secondary.discard(exclude)
+                if len(secondary) == candidates:
+                    break
+            return frozenset(secondary)
+
+        # Cheap substring tests first: a keyword that occurs nowhere in the text
+        # can't start a word either, so most topics are ruled out before tokenizing
+        text = text_to_analyze.lower()
+        candidates = [
+            topic_id
+            for topic_id, keywords in self.topic_keywords.items()
+            if topic_id != exclude and any(k in text for k in keywords)
+        ]
+        if not candidates:
+            return frozenset()
+
+        # Tokenize once, then every candidate is a C-level set intersection test
+        words = {w.lower() for w in _RE_WORD.findall(text_to_analyze)}
+        prefixes = {w[:n] for w in words for n in self.keyword_lengths}
+
+        for topic_id in candidates:
+            keywords = self.single_keywords[topic_id]
+            if not keywords.isdisjoint(prefixes):
+                secondary.add(topic_id)
                 continue
 
-            if any(keyword in text_to_analyze for keyword in keywords):
+            pattern = self.phrase_patterns.get(topic_id)
+            if pattern is not None and pattern.search(text_to_analyze):
                 secondary.add(topic_id)
 
-        return secondary
+        return frozenset(secondary)